@@ -50,13 +50,37 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # Enable PostGIS extension support
+        compare_type=True,
+        compare_server_default=True,
+    )
+
+    with context.begin_transaction():
+        # Ensure PostGIS extension is enabled
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        context.run_migrations()
+
+
 def run_migrations_online() -> None:
     """Run migrations in 'online' mode.
 
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    A caller may instead pass an open connection in
+    config.attributes["connection"] (e.g. the test suite
+    migrating its template database); it is used as-is.
+
     """
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -64,18 +88,7 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            # Enable PostGIS extension support
-            compare_type=True,
-            compare_server_default=True,
-        )
-
-        with context.begin_transaction():
-            # Ensure PostGIS extension is enabled
-            connection.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
-            context.run_migrations()
+        _run_migrations(connection)
 
 
 if context.is_offline_mode():
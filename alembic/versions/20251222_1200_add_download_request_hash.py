@@ -0,0 +1,36 @@
+"""add_download_request_hash
+
+Revision ID: 008_download_request_hash
+Revises: 007_pmtiles_tracking
+Create Date: 2025-12-22 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_download_request_hash'
+down_revision = '007_pmtiles_tracking'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash of the canonicalised download request (dataset ids, format, crs, geometry)
+    # Identical requests arriving while a job is still in flight reuse that job
+    op.add_column('download_jobs', sa.Column('request_hash', sa.String(64), nullable=True))
+
+    # Partial unique index: at most one pending/running job per request hash
+    op.create_index(
+        'ix_download_jobs_inflight',
+        'download_jobs',
+        ['request_hash'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_download_jobs_inflight', 'download_jobs')
+    op.drop_column('download_jobs', 'request_hash')
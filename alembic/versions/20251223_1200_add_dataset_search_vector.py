@@ -0,0 +1,52 @@
+"""add_dataset_search_vector
+
+Revision ID: 009_dataset_search_vector
+Revises: 008_download_request_hash
+Create Date: 2025-12-23 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '009_dataset_search_vector'
+down_revision = '008_download_request_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # array_to_string is only STABLE, which generated columns reject; wrap it
+    # in an IMMUTABLE function so keywords can be folded into the tsvector
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION immutable_array_to_string(text[], text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT array_to_string($1, $2) $$
+        """
+    )
+
+    # Full-text search vector over name, description and keywords
+    op.execute(
+        """
+        ALTER TABLE datasets
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector(
+                'english',
+                coalesce(name, '') || ' ' ||
+                coalesce(description, '') || ' ' ||
+                coalesce(immutable_array_to_string(keywords, ' '), '')
+            )
+        ) STORED
+        """
+    )
+
+    op.execute("CREATE INDEX datasets_fts_idx ON datasets USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS datasets_fts_idx")
+    op.drop_column('datasets', 'search_vector')
+    op.execute("DROP FUNCTION IF EXISTS immutable_array_to_string(text[], text)")
@@ -0,0 +1,25 @@
+"""add_dataset_keywords_gin
+
+Revision ID: 010_dataset_keywords_gin
+Revises: 009_dataset_search_vector
+Create Date: 2025-12-23 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010_dataset_keywords_gin'
+down_revision = '009_dataset_search_vector'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # themes already has a GIN index (ix_datasets_themes); give keywords the same
+    # so array overlap/containment filters avoid a sequential scan
+    op.create_index('ix_datasets_keywords', 'datasets', ['keywords'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_datasets_keywords', table_name='datasets')
@@ -0,0 +1,56 @@
+"""add_dataset_identity_unique
+
+Revision ID: 011_dataset_identity_unique
+Revises: 010_dataset_keywords_gin
+Create Date: 2025-12-24 12:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_dataset_identity_unique'
+down_revision = '010_dataset_keywords_gin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Earlier crawls could race and insert the same layer twice. Those rows
+    # carry their own download jobs, change checks and cache tables, so don't
+    # pick a survivor here: stop and let an operator merge or delete them.
+    if not context.is_offline_mode():
+        duplicates = op.get_bind().execute(
+            sa.text(
+                """
+                SELECT geoserver_id, access_url, array_agg(id ORDER BY updated_at DESC)
+                FROM datasets
+                GROUP BY geoserver_id, access_url
+                HAVING count(*) > 1
+                """
+            )
+        ).all()
+        if duplicates:
+            listing = "\n".join(
+                f"  geoserver {geoserver_id} {access_url}: {', '.join(map(str, ids))}"
+                for geoserver_id, access_url, ids in duplicates
+            )
+            raise RuntimeError(
+                f"{len(duplicates)} (geoserver_id, access_url) pairs have more than one "
+                f"dataset row (ids newest first). Merge or delete the extras, with their "
+                f"download jobs, change checks and cache tables, then re-run the "
+                f"migration:\n{listing}"
+            )
+
+    # Conflict target for the crawl's INSERT ... ON CONFLICT DO UPDATE
+    op.create_index(
+        'uq_datasets_geoserver_access_url',
+        'datasets',
+        ['geoserver_id', 'access_url'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_datasets_geoserver_access_url', table_name='datasets')
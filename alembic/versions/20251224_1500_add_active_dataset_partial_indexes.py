@@ -0,0 +1,44 @@
+"""add_active_dataset_partial_indexes
+
+Revision ID: 012_active_partial_indexes
+Revises: 011_dataset_identity_unique
+Create Date: 2025-12-24 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_active_partial_indexes'
+down_revision = '011_dataset_identity_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Search and facet queries always filter on is_active = true; the planner
+    # picks these partial indexes whenever that predicate is present
+    op.create_index(
+        'ix_datasets_active_geoserver',
+        'datasets',
+        ['geoserver_id'],
+        postgresql_where=sa.text('is_active = true'),
+    )
+    op.create_index(
+        'ix_datasets_active_themes',
+        'datasets',
+        ['themes'],
+        postgresql_using='gin',
+        postgresql_where=sa.text('is_active = true'),
+    )
+    op.execute(
+        "CREATE INDEX ix_datasets_active_search_vector ON datasets "
+        "USING GIN (search_vector) WHERE is_active = true"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_datasets_active_search_vector")
+    op.drop_index('ix_datasets_active_themes', table_name='datasets')
+    op.drop_index('ix_datasets_active_geoserver', table_name='datasets')
@@ -0,0 +1,25 @@
+"""add_geoserver_provider_index
+
+Revision ID: 013_geoserver_provider_index
+Revises: 012_active_partial_indexes
+Create Date: 2025-12-26 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '013_geoserver_provider_index'
+down_revision = '012_active_partial_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # provider_type is already the native provider_type ENUM (4 bytes per row);
+    # index it for the servers list provider filter
+    op.create_index('ix_geoservers_provider_type', 'geoservers', ['provider_type'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_geoservers_provider_type', table_name='geoservers')
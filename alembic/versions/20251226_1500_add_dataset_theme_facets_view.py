@@ -0,0 +1,35 @@
+"""add_dataset_theme_facets_view
+
+Revision ID: 014_theme_facets_view
+Revises: 013_geoserver_provider_index
+Create Date: 2025-12-26 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '014_theme_facets_view'
+down_revision = '013_geoserver_provider_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Precomputed theme facet counts for unfiltered searches; refreshed after crawls
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW dataset_theme_facets AS
+        SELECT unnest(themes) AS theme, count(*) AS dataset_count
+        FROM datasets
+        WHERE is_active = true
+        GROUP BY 1
+        """
+    )
+
+    # Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX uq_dataset_theme_facets_theme ON dataset_theme_facets (theme)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS dataset_theme_facets")
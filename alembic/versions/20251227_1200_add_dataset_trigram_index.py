@@ -0,0 +1,30 @@
+"""add_dataset_trigram_index
+
+Revision ID: 015_dataset_trigram_index
+Revises: 014_theme_facets_view
+Create Date: 2025-12-27 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '015_dataset_trigram_index'
+down_revision = '014_theme_facets_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Trigram index for substring (ILIKE '%...%') and similarity matches on
+    # name/description; complements the whole-word tsvector index
+    op.execute(
+        "CREATE INDEX ix_datasets_name_description_trgm ON datasets "
+        "USING GIN (name gin_trgm_ops, description gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_datasets_name_description_trgm")
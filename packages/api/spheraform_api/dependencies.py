@@ -1,9 +1,10 @@
 """FastAPI dependencies."""
 
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from spheraform_core.database import SessionLocal
+from spheraform_core.database import AsyncSessionLocal, SessionLocal
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -17,3 +18,13 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session.
+
+    For async routes, so database I/O doesn't block the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
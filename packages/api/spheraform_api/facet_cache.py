@@ -0,0 +1,93 @@
+"""
+In-process cache for search facet counts.
+
+Facets are a GROUP BY over every active dataset and are identical for every
+request with the same filter signature, so they are cached per signature and
+invalidated by a version counter that is bumped whenever a Dataset row is
+inserted, updated or deleted through the ORM.
+
+Writes made by other processes (e.g. Celery crawl workers) don't bump this
+process's counter, so entries also expire after FACET_TTL_SECONDS.
+
+The dataset_theme_facets materialized view is kept current by whoever writes
+datasets: crawl workers refresh it after every service they commit, and API
+requests that remove datasets queue a refresh task (tasks.crawl.refresh_facets).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from spheraform_core.models import Dataset
+
+FACET_CACHE_SIZE = 512
+FACET_TTL_SECONDS = 60
+
+_version = 0
+_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+
+
+def get_version() -> int:
+    """Current dataset version; changes whenever a Dataset is written."""
+    return _version
+
+
+def bump_version(*_args) -> None:
+    """Invalidate all cached facets."""
+    global _version
+    _version += 1
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Dataset, _event_name, bump_version)
+
+
+def refresh_materialized_facets(db: Session) -> None:
+    """
+    Recompute the dataset_theme_facets materialized view.
+
+    Called after anything that adds, removes or deactivates datasets: each
+    crawled service, crawl completion and failure, and (via the refresh_facets
+    task) crawl cancellation and server deletion.
+
+    CONCURRENTLY keeps the view readable by searches during the refresh (it
+    needs the view's unique index on theme). No-op on non-PostgreSQL databases.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY dataset_theme_facets"))
+    db.commit()
+    bump_version()
+
+
+def clear() -> None:
+    """Drop every cached entry."""
+    _cache.clear()
+
+
+async def get_facets(signature: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Return cached facets for ``signature``, computing them on a miss.
+
+    Args:
+        signature: Hashable description of the filters the facets depend on
+        compute: Coroutine factory that runs the facet aggregation
+
+    Returns:
+        The (possibly cached) facet result
+    """
+    key = (signature, _version, int(time.monotonic() // FACET_TTL_SECONDS))
+    try:
+        _cache.move_to_end(key)
+        return _cache[key]
+    except KeyError:
+        pass
+
+    result = await compute()
+    _cache[key] = result
+    if len(_cache) > FACET_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
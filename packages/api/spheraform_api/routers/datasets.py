@@ -3,12 +3,12 @@
 from typing import List, Optional, Literal
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, undefer
 from geoalchemy2.functions import ST_Intersects, ST_Contains, ST_Within, ST_MakeEnvelope
 
 from ..dependencies import get_db
 from ..schemas import DatasetResponse
-from spheraform_core.models import Dataset, Geoserver, ProviderType
+from spheraform_core.models import Dataset, ProviderType
 from spheraform_core.adapters import ArcGISAdapter
 from spheraform_core.storage.s3_client import S3Client
 
@@ -85,14 +85,18 @@ async def list_datasets(
                 detail=f"Invalid bbox parameter: {str(e)}. Expected format: 'west,south,east,north'"
             )
 
-    datasets = query.offset(skip).limit(limit).all()
+    # bbox is deferred on the model but part of the response; load it with the
+    # rows instead of one lazy SELECT per dataset
+    datasets = query.options(undefer(Dataset.bbox)).offset(skip).limit(limit).all()
     return datasets
 
 
 @router.get("/{dataset_id}", response_model=DatasetResponse)
 async def get_dataset(dataset_id: UUID, db: Session = Depends(get_db)):
     """Get details of a specific dataset."""
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = (
+        db.query(Dataset).options(undefer(Dataset.bbox)).filter(Dataset.id == dataset_id).first()
+    )
     if not dataset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -108,15 +112,20 @@ async def preview_dataset(dataset_id: UUID, limit: int = 100, db: Session = Depe
 
     Returns a small sample of features for map preview.
     """
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    # Fetch the dataset and its geoserver in one query
+    dataset = (
+        db.query(Dataset)
+        .options(joinedload(Dataset.geoserver))
+        .filter(Dataset.id == dataset_id)
+        .first()
+    )
     if not dataset:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Dataset {dataset_id} not found",
         )
 
-    # Get the associated geoserver
-    geoserver = db.query(Geoserver).filter(Geoserver.id == dataset.geoserver_id).first()
+    geoserver = dataset.geoserver
     if not geoserver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
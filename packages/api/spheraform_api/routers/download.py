@@ -1,19 +1,28 @@
 """Download and export endpoints."""
 
+import hashlib
 import json
 import logging
 import os
 import tempfile
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from ..celery_app import celery_app
 from ..dependencies import get_db
-from ..schemas import DownloadRequest, DownloadResponse, JobStatusResponse, DownloadJobProgressResponse
+from ..schemas import (
+    DownloadRequest,
+    DownloadResponse,
+    JobStatusResponse,
+    DownloadJobProgressResponse,
+    FORMAT_MEDIA_TYPES,
+)
 from ..services.download import DownloadService
 from ..tasks.download import process_download_job
 from spheraform_core.models import Dataset, DownloadJob, JobStatus, Geoserver, ProviderType, DownloadStrategy
@@ -24,6 +33,56 @@ from spheraform_core.config import settings
 logger = logging.getLogger("gunicorn.error")
 router = APIRouter()
 
+# Job states that count as "in flight" for request coalescing
+INFLIGHT_STATUSES = (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+def _request_hash(params: dict) -> str:
+    """SHA-256 of the canonicalised request params (sorted keys, compact separators)."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _find_inflight_job(db: Session, request_hash: str) -> DownloadJob | None:
+    """Return the pending/running job for a request hash, if any."""
+    return (
+        db.query(DownloadJob)
+        .filter(
+            DownloadJob.request_hash == request_hash,
+            DownloadJob.status.in_(INFLIGHT_STATUSES),
+        )
+        .first()
+    )
+
+
+def _abandon_stale_jobs(db: Session, request_hash: str) -> int:
+    """
+    Mark in-flight jobs for a request hash failed once they look abandoned.
+
+    A job untouched for DOWNLOAD_INFLIGHT_TIMEOUT seconds (e.g. its Celery task
+    was lost) would otherwise absorb every identical request and hold the
+    in-flight index slot forever. Should its task still turn up, the worker's
+    PENDING -> RUNNING claim fails and it skips the job.
+
+    Returns:
+        Number of jobs abandoned (the caller commits)
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.download_inflight_timeout)
+    return db.execute(
+        update(DownloadJob)
+        .where(
+            DownloadJob.request_hash == request_hash,
+            DownloadJob.status.in_(INFLIGHT_STATUSES),
+            DownloadJob.updated_at < cutoff,
+        )
+        .values(
+            status=JobStatus.FAILED,
+            completed_at=datetime.utcnow(),
+            current_stage="failed",
+            error="Abandoned: no progress before the in-flight timeout",
+        )
+    ).rowcount
+
 
 @router.post("", response_model=DownloadResponse)
 async def download_datasets(request: DownloadRequest, db: Session = Depends(get_db)):
@@ -64,6 +123,27 @@ async def download_datasets(request: DownloadRequest, db: Session = Depends(get_
             status="ready",
         )
 
+    params = {
+        "dataset_ids": sorted(str(d.id) for d in datasets),
+        "format": request.format,
+        "crs": request.crs,
+        "merge": request.merge,
+        "geometry": request.geometry,
+    }
+    request_hash = _request_hash(params)
+
+    # Piggyback on an identical download that is already in flight
+    if _abandon_stale_jobs(db, request_hash):
+        logger.warning(f"Abandoned stale download job(s) for request {request_hash}")
+        db.commit()
+    existing = _find_inflight_job(db, request_hash)
+    if existing:
+        logger.info(f"Reusing in-flight download job {existing.id} for dataset {dataset.id}")
+        return DownloadResponse(
+            job_id=existing.id,
+            status="queued",
+        )
+
     # Always create a job for progress tracking
     job = DownloadJob(
         dataset_id=dataset.id,
@@ -74,16 +154,24 @@ async def download_datasets(request: DownloadRequest, db: Session = Depends(get_
         current_stage="pending",
         features_downloaded=0,
         features_stored=0,
-        params={
-            "dataset_ids": [str(d.id) for d in datasets],
-            "format": request.format,
-            "crs": request.crs,
-            "merge": request.merge,
-            "geometry": request.geometry,
-        },
+        params=params,
+        request_hash=request_hash,
     )
     db.add(job)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost the race against a concurrent identical request - the partial
+        # unique index on in-flight jobs rejected ours, so return theirs
+        db.rollback()
+        existing = _find_inflight_job(db, request_hash)
+        if not existing:
+            raise
+        logger.info(f"Reusing in-flight download job {existing.id} for dataset {dataset.id}")
+        return DownloadResponse(
+            job_id=existing.id,
+            status="queued",
+        )
     db.refresh(job)
 
     logger.info(f"Created download job {job.id} for dataset {dataset.id}")
@@ -366,7 +454,27 @@ async def download_job_result(job_id: UUID, db: Session = Depends(get_db)):
             detail=f"Job is not completed (status: {job.status})",
         )
 
-    # TODO: Return FileResponse with the actual file
+    output_path = job.output_path or ""
+
+    # Artifacts in object storage: hand the client a presigned URL so the bytes
+    # come straight from S3/MinIO instead of streaming through the API process
+    if output_path.startswith("s3://"):
+        from spheraform_core.storage.s3_client import S3Client
+
+        bucket, _, key = output_path[len("s3://"):].partition("/")
+        presigned_url = await S3Client().get_presigned_url(key, bucket=bucket, expiration=3600)
+        return RedirectResponse(presigned_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    # Local artifact on disk
+    if output_path and os.path.isfile(output_path):
+        output_format = (job.params or {}).get("format", "geojson")
+        return FileResponse(
+            path=output_path,
+            media_type=FORMAT_MEDIA_TYPES.get(output_format, "application/octet-stream"),
+            filename=os.path.basename(output_path),
+        )
+
+    # Cached dataset served by the file endpoint
     return {"download_url": job.output_path}
 
 
@@ -445,7 +553,7 @@ async def download_dataset_file(
         logger.info(f"Serving cached dataset {dataset_id} from {dataset.cache_table}")
         return FileResponse(
             path=temp_path,
-            media_type="application/geo+json",
+            media_type=FORMAT_MEDIA_TYPES["geojson"],
             filename=filename,
             background=None,
         )
@@ -1,83 +1,166 @@
 """Search endpoints."""
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
-from geoalchemy2.functions import ST_Intersects, ST_Buffer, ST_MakePoint
-
-from ..dependencies import get_db
+import json
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Text, and_, cast, column, func, literal_column, or_, select, table
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import undefer
+from geoalchemy2 import Geography, Geometry
+from geoalchemy2.functions import (
+    ST_Intersects,
+    ST_Buffer,
+    ST_MakePoint,
+    ST_MakeEnvelope,
+    ST_GeomFromGeoJSON,
+    ST_SetSRID,
+)
+
+from .. import facet_cache
+from ..dependencies import get_async_db
 from ..schemas import SearchRequest, SearchResponse, DatasetResponse
 from spheraform_core.models import Dataset
 
 router = APIRouter()
 
+# Generated tsvector column (migration 009). Not mapped on the model since it
+# only exists on PostgreSQL; other databases fall back to ILIKE on name,
+# description and the keywords' JSON text.
+search_vector = literal_column("datasets.search_vector")
+
+# Materialized theme counts over active datasets (migration 014), refreshed
+# by the writers after dataset changes (see facet_cache)
+theme_facets_view = table("dataset_theme_facets", column("theme"), column("dataset_count"))
+
+
+def _intersects_bbox(geom):
+    """
+    Two-stage spatial filter on Dataset.bbox.
+
+    ``&&`` compares bounding boxes only and is answered from the GiST index on
+    bbox; ST_Intersects then refines the (few) candidates it lets through.
+    """
+    return and_(Dataset.bbox.op("&&")(geom), ST_Intersects(Dataset.bbox, geom))
+
 
 @router.post("", response_model=SearchResponse)
-async def search_datasets(request: SearchRequest, db: Session = Depends(get_db)):
+async def search_datasets(request: SearchRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Search for datasets by location, text, themes, etc.
 
     Supports spatial search, full-text search, and filtering by themes/formats.
     """
-    query = db.query(Dataset).filter(Dataset.is_active == True)
+    base_filter = Dataset.is_active == True
+    query = select(Dataset).where(base_filter)
 
     # Spatial search
     if request.geometry:
-        # TODO: Parse GeoJSON geometry and create spatial filter
-        pass
+        search_geom = ST_SetSRID(ST_GeomFromGeoJSON(json.dumps(request.geometry)), 4326)
+        query = query.where(_intersects_bbox(search_geom))
+
+    elif request.bbox:
+        minx, miny, maxx, maxy = request.bbox
+        query = query.where(_intersects_bbox(ST_MakeEnvelope(minx, miny, maxx, maxy, 4326)))
 
     elif request.point and request.buffer_km:
-        # Create point with buffer
+        # Buffer on geography so the distance is in metres, not degrees, then
+        # cast back to a 4326 geometry for the bbox index
         lon, lat = request.point
-        point_geom = ST_MakePoint(lon, lat)
-        buffer_geom = ST_Buffer(point_geom, request.buffer_km * 1000)  # Convert km to meters
+        point_geom = ST_SetSRID(ST_MakePoint(lon, lat), 4326)
+        buffer_geom = cast(
+            ST_Buffer(cast(point_geom, Geography(srid=4326)), request.buffer_km * 1000),
+            Geometry(srid=4326),
+        )
 
-        query = query.filter(ST_Intersects(Dataset.bbox, buffer_geom))
+        query = query.where(_intersects_bbox(buffer_geom))
 
-    # Text search (simple version - can be improved with full-text search)
+    # Text search. On PostgreSQL whole-word matches come from the tsvector GIN
+    # index and substring matches ("wate") from the pg_trgm GIN index, which
+    # also serves ILIKE '%...%'; results are ranked by name similarity.
+    ranking = None
     if request.text:
-        search_term = f"%{request.text}%"
-        query = query.filter(
-            or_(
-                Dataset.name.ilike(search_term),
-                Dataset.description.ilike(search_term),
-                Dataset.keywords.any(search_term),
+        if db.get_bind().dialect.name == "postgresql":
+            search_term = f"%{request.text}%"
+            query = query.where(
+                or_(
+                    search_vector.op("@@")(func.plainto_tsquery("english", request.text)),
+                    Dataset.name.ilike(search_term),
+                    Dataset.description.ilike(search_term),
+                )
+            )
+            ranking = func.similarity(Dataset.name, request.text).desc()
+        else:
+            search_term = f"%{request.text}%"
+            query = query.where(
+                or_(
+                    Dataset.name.ilike(search_term),
+                    Dataset.description.ilike(search_term),
+                    # keywords is stored as a JSON array there; match its text
+                    cast(Dataset.keywords, Text).ilike(search_term),
+                )
             )
-        )
 
-    # Filter by themes
+    # Filter by themes: a single `themes && ARRAY[...]` overlap, served by the
+    # GIN index on themes (ArrayOfText has no ARRAY comparator, hence the op)
     if request.themes:
-        query = query.filter(Dataset.themes.overlap(request.themes))
+        query = query.where(Dataset.themes.op("&&")(cast(request.themes, ARRAY(Text))))
 
     # Filter by cached status
     if request.cached_only:
-        query = query.filter(Dataset.is_cached == True)
+        query = query.where(Dataset.is_cached == True)
 
     # Filter by update date
     if request.updated_after:
-        query = query.filter(Dataset.updated_date >= request.updated_after)
-
-    # Get total count before pagination
-    total = query.count()
-
-    # Apply pagination
-    datasets = query.offset(request.offset).limit(request.limit).all()
+        query = query.where(Dataset.updated_date >= request.updated_after)
+
+    # Page and total in one statement: count(*) OVER () is evaluated before
+    # LIMIT/OFFSET, so every returned row carries the full match count.
+    # bbox is deferred on the model; load it up front since the response includes it
+    page = query.add_columns(func.count().over().label("total")).options(undefer(Dataset.bbox))
+    if ranking is not None:
+        page = page.order_by(ranking)
+    result = await db.execute(page.offset(request.offset).limit(request.limit))
+    rows = result.all()
+    datasets = [row.Dataset for row in rows]
+
+    if rows:
+        total = rows[0].total
+    elif request.offset:
+        # Paged past the end: no row to read the window count from
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    else:
+        total = 0
 
     # Calculate facets (for UI filtering)
     facets = {}
 
-    # Theme facets
+    # Theme facets (cached per filter signature). Unfiltered searches read the
+    # precomputed dataset_theme_facets view on PostgreSQL; filtered ones
+    # aggregate over the matching datasets only.
     if not request.themes:
-        theme_facets = (
-            db.query(func.unnest(Dataset.themes).label("theme"), func.count())
-            .filter(Dataset.is_active == True)
-            .group_by("theme")
-            .all()
-        )
-        facets["themes"] = {theme: count for theme, count in theme_facets}
-
-    return SearchResponse(
+        unfiltered = query.whereclause.compare(base_filter)
+
+        async def theme_counts():
+            if unfiltered and db.get_bind().dialect.name == "postgresql":
+                rows = await db.execute(
+                    select(theme_facets_view.c.theme, theme_facets_view.c.dataset_count)
+                )
+            else:
+                matches = query.with_only_columns(Dataset.themes).subquery()
+                theme = func.unnest(matches.c.themes).label("theme")
+                rows = await db.execute(select(theme, func.count()).group_by(theme))
+            return {theme: count for theme, count in rows}
+
+        signature = ("themes", request.model_dump_json(exclude={"limit", "offset"}))
+        facets["themes"] = await facet_cache.get_facets(signature, theme_counts)
+
+    # Validate once and let pydantic-core encode straight to JSON bytes;
+    # returning the model would have FastAPI validate it again against
+    # response_model (re-running DatasetResponse validators per row)
+    body = SearchResponse(
         total=total,
         datasets=datasets,
         facets=facets,
     )
+    return Response(content=body.model_dump_json(), media_type="application/json")
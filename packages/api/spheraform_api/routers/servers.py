@@ -1,17 +1,19 @@
 """Server management endpoints."""
+import hashlib
 import logging
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 
 from ..celery_app import celery_app
-from ..dependencies import get_db
+from ..facet_cache import refresh_materialized_facets
+from ..dependencies import get_async_db
 from ..schemas import ServerCreate, ServerUpdate, ServerResponse, CrawlJobResponse
-from ..tasks.crawl import process_crawl_job
+from ..tasks.crawl import process_crawl_job, refresh_facets
 from spheraform_core.models import Geoserver, HealthStatus, Dataset, ProviderType, CrawlJob, JobStatus
 from spheraform_core.adapters import ArcGISAdapter
 from spheraform_core.config import settings
@@ -20,8 +22,22 @@ router = APIRouter()
 logger = logging.getLogger("gunicorn.error")
 
 
+async def _refresh_facets(db: AsyncSession) -> None:
+    """
+    Refresh the search facet view after datasets were removed.
+
+    REFRESH MATERIALIZED VIEW scans every dataset, so with Celery enabled it is
+    handed to a worker instead of holding up the response. The legacy
+    single-process mode has no worker to hand it to and refreshes inline.
+    """
+    if settings.use_celery:
+        refresh_facets.delay()
+    else:
+        await db.run_sync(refresh_materialized_facets)
+
+
 @router.post("", response_model=ServerResponse, status_code=status.HTTP_201_CREATED)
-async def create_server(server: ServerCreate, db: Session = Depends(get_db)):
+async def create_server(server: ServerCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new geoserver.
 
@@ -45,27 +61,55 @@ async def create_server(server: ServerCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_server)
-    db.commit()
-    db.refresh(db_server)
+    await db.commit()
+    await db.refresh(db_server)
 
     return db_server
 
 
 @router.get("", response_model=List[ServerResponse])
 async def list_servers(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    provider_type: Optional[ProviderType] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """List all registered geoservers."""
-    servers = db.query(Geoserver).offset(skip).limit(limit).all()
-    return servers
+    """
+    List all registered geoservers.
+
+    Responses carry a weak ETag derived from the newest ``updated_at`` and the
+    row count, so clients revalidating with ``If-None-Match`` get a 304 without
+    the list being loaded or serialised.
+    """
+    filters = []
+    if provider_type is not None:
+        filters.append(Geoserver.provider_type == provider_type)
+
+    max_updated, count = (
+        await db.execute(
+            select(func.max(Geoserver.updated_at), func.count()).select_from(Geoserver).where(*filters)
+        )
+    ).one()
+    digest = hashlib.sha256(
+        f"{max_updated}:{count}:{provider_type}:{skip}:{limit}".encode()
+    ).hexdigest()
+    etag = f'W/"{digest}"'
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    result = await db.execute(select(Geoserver).where(*filters).offset(skip).limit(limit))
+    return result.scalars().all()
 
 
 @router.get("/{server_id}", response_model=ServerResponse)
-async def get_server(server_id: UUID, db: Session = Depends(get_db)):
+async def get_server(server_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get details of a specific geoserver."""
-    server = db.query(Geoserver).filter(Geoserver.id == server_id).first()
+    server = await db.get(Geoserver, server_id)
     if not server:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -78,10 +122,10 @@ async def get_server(server_id: UUID, db: Session = Depends(get_db)):
 async def update_server(
     server_id: UUID,
     server_update: ServerUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Update a geoserver's configuration."""
-    server = db.query(Geoserver).filter(Geoserver.id == server_id).first()
+    server = await db.get(Geoserver, server_id)
     if not server:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -93,35 +137,38 @@ async def update_server(
     for field, value in update_data.items():
         setattr(server, field, value)
 
-    db.commit()
-    db.refresh(server)
+    await db.commit()
+    await db.refresh(server)
 
     return server
 
 
 @router.delete("/{server_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_server(server_id: UUID, db: Session = Depends(get_db)):
+async def delete_server(server_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Remove a geoserver from the registry."""
-    server = db.query(Geoserver).filter(Geoserver.id == server_id).first()
+    server = await db.get(Geoserver, server_id)
     if not server:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Server {server_id} not found",
         )
 
-    db.delete(server)
-    db.commit()
+    await db.delete(server)
+    await db.commit()
+
+    # Its datasets went with it (ON DELETE CASCADE)
+    await _refresh_facets(db)
 
 
 @router.post("/{server_id}/crawl", response_model=CrawlJobResponse, status_code=status.HTTP_202_ACCEPTED)
-async def trigger_crawl(server_id: UUID, db: Session = Depends(get_db)):
+async def trigger_crawl(server_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Trigger an async discovery/crawl job for this server.
 
     Creates a background job that discovers all datasets on the server.
     Poll GET /api/v1/servers/crawl/{job_id} for progress updates.
     """
-    server = db.query(Geoserver).filter(Geoserver.id == server_id).first()
+    server = await db.get(Geoserver, server_id)
     if not server:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -146,8 +193,8 @@ async def trigger_crawl(server_id: UUID, db: Session = Depends(get_db)):
         datasets_updated=0,
     )
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
 
     logger.info(f"Created crawl job {job.id} for server {server_id}")
 
@@ -158,7 +205,7 @@ async def trigger_crawl(server_id: UUID, db: Session = Depends(get_db)):
         # Submit to Celery queue
         task = process_crawl_job.delay(str(job.id))
         job.celery_task_id = task.id
-        db.commit()
+        await db.commit()
 
     return CrawlJobResponse(
         id=job.id,
@@ -179,13 +226,13 @@ async def trigger_crawl(server_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/{server_id}/crawl/latest", response_model=CrawlJobResponse)
-async def get_latest_crawl_job(server_id: UUID, db: Session = Depends(get_db)):
+async def get_latest_crawl_job(server_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get the most recent crawl job for a server (for resuming progress tracking)."""
-    job = (
-        db.query(CrawlJob)
-        .filter(CrawlJob.geoserver_id == server_id)
+    job = await db.scalar(
+        select(CrawlJob)
+        .where(CrawlJob.geoserver_id == server_id)
         .order_by(CrawlJob.created_at.desc())
-        .first()
+        .limit(1)
     )
 
     if not job:
@@ -205,7 +252,7 @@ async def get_latest_crawl_job(server_id: UUID, db: Session = Depends(get_db)):
                 job.status = JobStatus.RUNNING
                 if not job.started_at:
                     job.started_at = datetime.utcnow()
-                db.commit()
+                await db.commit()
         except Exception as e:
             logger.warning(f"Failed to get Celery task state for crawl job {job.id}: {e}")
 
@@ -230,9 +277,9 @@ async def get_latest_crawl_job(server_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/crawl/{job_id}", response_model=CrawlJobResponse)
-async def get_crawl_status(job_id: UUID, db: Session = Depends(get_db)):
+async def get_crawl_status(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get the status and progress of a crawl job."""
-    job = db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+    job = await db.get(CrawlJob, job_id)
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -251,7 +298,7 @@ async def get_crawl_status(job_id: UUID, db: Session = Depends(get_db)):
                 job.status = JobStatus.RUNNING
                 if not job.started_at:
                     job.started_at = datetime.utcnow()
-                db.commit()
+                await db.commit()
 
             logger.debug(f"Crawl job {job_id} - Celery state: {celery_state}, DB status: {job.status}")
         except Exception as e:
@@ -282,9 +329,9 @@ async def get_crawl_status(job_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.post("/crawl/{job_id}/cancel", response_model=CrawlJobResponse)
-async def cancel_crawl_job(job_id: UUID, db: Session = Depends(get_db)):
+async def cancel_crawl_job(job_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Cancel a running or pending crawl job."""
-    job = db.query(CrawlJob).filter(CrawlJob.id == job_id).first()
+    job = await db.get(CrawlJob, job_id)
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -310,7 +357,10 @@ async def cancel_crawl_job(job_id: UUID, db: Session = Depends(get_db)):
     job.status = JobStatus.CANCELLED
     job.completed_at = datetime.utcnow()
     job.current_stage = "cancelled"
-    db.commit()
+    await db.commit()
+
+    # finalize won't run, so publish what the crawl wrote before it stopped
+    await _refresh_facets(db)
 
     logger.info(f"Crawl job {job_id} cancelled")
 
@@ -333,13 +383,13 @@ async def cancel_crawl_job(job_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/{server_id}/health")
-async def check_health(server_id: UUID, db: Session = Depends(get_db)):
+async def check_health(server_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """
     Check the health status of a geoserver.
 
     This performs a quick health check and updates the status.
     """
-    server = db.query(Geoserver).filter(Geoserver.id == server_id).first()
+    server = await db.get(Geoserver, server_id)
     if not server:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,7 +1,8 @@
 """Pydantic schemas for API request/response models."""
 
 from datetime import datetime
-from typing import Optional, List, Any
+from types import MappingProxyType
+from typing import Optional, List, Any, Final, Literal, Mapping
 from uuid import UUID
 from pydantic import BaseModel, Field, field_validator, model_validator
 from geoalchemy2.shape import to_shape
@@ -141,6 +142,9 @@ class SearchRequest(BaseModel):
     """Schema for search request."""
 
     geometry: Optional[dict] = Field(None, description="GeoJSON geometry to search within")
+    bbox: Optional[List[float]] = Field(
+        None, min_length=4, max_length=4, description="[minx, miny, maxx, maxy] in EPSG:4326"
+    )
     point: Optional[List[float]] = Field(None, description="[lon, lat] point")
     buffer_km: Optional[float] = Field(None, description="Buffer distance in kilometers")
     text: Optional[str] = Field(None, description="Full-text search")
@@ -163,12 +167,22 @@ class SearchResponse(BaseModel):
 
 # --- Download Schemas ---
 
+# Download formats, validated by pydantic-core as a Literal (no Python validator call)
+DownloadFormat = Literal["geojson", "shapefile", "gpkg"]
+
+FORMAT_MEDIA_TYPES: Final[Mapping[str, str]] = MappingProxyType({
+    "geojson": "application/geo+json",
+    "shapefile": "application/zip",
+    "gpkg": "application/geopackage+sqlite3",
+})
+
+
 class DownloadRequest(BaseModel):
     """Schema for download request."""
 
     dataset_ids: List[UUID] = Field(..., description="Dataset IDs to download")
     geometry: Optional[dict] = Field(None, description="GeoJSON geometry to clip")
-    format: str = Field("geojson", description="Output format")
+    format: DownloadFormat = Field("geojson", description="Output format")
     crs: Optional[str] = Field(None, description="Target CRS (e.g., EPSG:4326)")
     merge: bool = Field(False, description="Merge into single file")
     force_refresh: bool = Field(False, description="Force re-fetch even if cached")
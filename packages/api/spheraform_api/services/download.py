@@ -32,6 +32,9 @@ MIN_FEATURES_FOR_OBJECT_STORAGE = int(os.getenv("MIN_FEATURES_FOR_OBJECT_STORAGE
 class DownloadService:
     """Service for downloading and caching datasets."""
 
+    # Features inserted between progress updates and cancellation checks
+    BATCH_SIZE = 1000
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -349,7 +352,7 @@ class DownloadService:
                 self.db.commit()
 
         # Insert in batches for better progress feedback
-        batch_size = 1000
+        batch_size = self.BATCH_SIZE
         for i in range(0, total_features, batch_size):
             # Check if job was cancelled
             if job_id:
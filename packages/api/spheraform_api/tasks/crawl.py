@@ -4,18 +4,161 @@ import asyncio
 import json
 import logging
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
 from celery import group
-from sqlalchemy import func
+import orjson
+from sqlalchemy import JSON, Text, bindparam, cast, column, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from ..celery_app import celery_app
 from ..celery_utils import get_db_session
+from ..facet_cache import refresh_materialized_facets
 from spheraform_core.models import CrawlJob, Geoserver, Dataset, JobStatus, HealthStatus
-from spheraform_core.adapters import ArcGISAdapter
+from spheraform_core.adapters import ArcGISAdapter, DatasetMetadata
 
 logger = logging.getLogger("gunicorn.error")
 
+# Datasets per INSERT ... ON CONFLICT statement during service processing
+UPSERT_BATCH_SIZE = 500
+
+# Longest a discovered dataset waits in a partial batch before it is written
+UPSERT_BATCH_SECONDS = 5.0
+
+# Discovered datasets buffered between the adapter and the database writer
+CRAWL_QUEUE_SIZE = 1000
+
+# Columns refreshed from the source when a crawled dataset already exists
+_UPSERT_COLUMNS = (
+    "external_id",
+    "name",
+    "description",
+    "feature_count",
+    "bbox",
+    "keywords",
+    "service_item_id",
+    "geometry_type",
+    "source_srid",
+    "max_record_count",
+    "last_edit_date",
+    "themes",
+)
+
+
+def _bbox_ewkt(bbox) -> Optional[str]:
+    """EWKT polygon for a (minx, miny, maxx, maxy) bbox already in EPSG:4326."""
+    if not bbox:
+        return None
+    minx, miny, maxx, maxy = bbox
+    return f"SRID=4326;POLYGON(({minx} {miny},{maxx} {miny},{maxx} {maxy},{minx} {maxy},{minx} {miny}))"
+
+
+def _batch_payload(batch: list[DatasetMetadata]) -> str:
+    """Serialise a batch of discovered datasets to the JSON array of records the upsert expands."""
+    rows = []
+    for dataset in batch:
+        row = {name: getattr(dataset, name) for name in _RECORD_COLUMNS}
+        row["bbox"] = _bbox_ewkt(dataset.bbox)
+        source_metadata = dataset.source_metadata
+        if isinstance(source_metadata, dict):
+            source_metadata = json.dumps(source_metadata)
+        row["source_metadata"] = source_metadata or None
+        rows.append(row)
+    return orjson.dumps(rows).decode()
+
+
+# Fields carried per dataset in the JSON payload (bbox travels as EWKT text)
+_RECORD_COLUMNS = (
+    "external_id",
+    "name",
+    "access_url",
+    "description",
+    "keywords",
+    "bbox",
+    "feature_count",
+    "source_metadata",
+    "service_item_id",
+    "geometry_type",
+    "source_srid",
+    "last_edit_date",
+    "themes",
+    "max_record_count",
+)
+
+
+def _build_upsert_statement():
+    """
+    INSERT ... SELECT FROM json_to_recordset ... ON CONFLICT DO UPDATE, built once.
+
+    The whole batch is bound as a single JSON parameter and expanded
+    server-side, so each batch is one small statement with two parameters
+    regardless of its size. Datasets are identified by
+    (geoserver_id, access_url), backed by the uq_datasets_geoserver_access_url
+    unique index.
+    """
+    table = Dataset.__table__
+    record = (
+        func.json_to_recordset(cast(bindparam("rows", type_=Text), JSON))
+        .table_valued(
+            *(
+                column(name, Text if name == "bbox" else table.c[name].type)
+                for name in _RECORD_COLUMNS
+            )
+        )
+        .render_derived(name="record", with_types=True)
+    )
+
+    # Column defaults live on the Python side, which INSERT ... SELECT bypasses.
+    # Cast explicitly: select-list parameters resolve to text, and text has no
+    # assignment cast to the enum columns
+    defaults = {
+        col.name: cast(literal(col.default.arg, col.type), col.type)
+        for col in table.columns
+        if col.default is not None and col.default.is_scalar
+    }
+    values = {
+        **defaults,
+        "id": func.gen_random_uuid(),
+        "geoserver_id": bindparam("geoserver_id", type_=table.c.geoserver_id.type),
+        "created_at": func.now(),
+        "updated_at": func.now(),
+        **{name: record.c[name] for name in _RECORD_COLUMNS},
+        "bbox": func.ST_GeomFromEWKT(record.c.bbox),
+    }
+    # DISTINCT ON: ON CONFLICT may not touch the same row twice in one statement
+    rows = select(*values.values()).distinct(record.c.access_url)
+
+    stmt = pg_insert(table).from_select(list(values), rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[Dataset.geoserver_id, Dataset.access_url],
+        set_={
+            **{column: stmt.excluded[column] for column in _UPSERT_COLUMNS},
+            # Keep previously stored metadata when the source no longer reports any
+            "source_metadata": func.coalesce(
+                stmt.excluded.source_metadata, Dataset.source_metadata
+            ),
+            "updated_at": func.now(),
+        },
+    ).returning(literal_column("xmax = 0").label("inserted"))
+
+
+_UPSERT_STATEMENT = _build_upsert_statement()
+
+
+def _upsert_datasets(db, server_id, batch: list[DatasetMetadata]) -> int:
+    """
+    Insert or update a batch of crawled datasets.
+
+    Returns:
+        Number of rows that were newly inserted (the rest were updates)
+    """
+    result = db.connection().execute(
+        _UPSERT_STATEMENT, {"geoserver_id": server_id, "rows": _batch_payload(batch)}
+    )
+    # xmax is 0 only for tuples created by this statement, not updated ones
+    return sum(1 for inserted in result.scalars() if inserted)
+
 
 @celery_app.task(bind=True, name="crawl.process_server")
 def process_crawl_job(self, crawl_job_id: str):
@@ -82,6 +225,7 @@ def process_crawl_job(self, crawl_job_id: str):
             job.current_stage = "failed"
             job.error = str(e)
             db.commit()
+            refresh_materialized_facets(db)
             raise
 
 
@@ -182,85 +326,26 @@ async def _process_service_async(self, crawl_job_id: str, service_url: str):
                 connection_config=server_connection_config,
                 country_hint=server_country,
             ) as adapter:
-                # Discover layers in this service
-                async for dataset_meta in adapter.discover_datasets():
-                    # Upsert dataset to database
-
-                    # Check if dataset exists
-                    existing = (
-                        db.query(Dataset)
-                        .filter(
-                            Dataset.geoserver_id == server_id,
-                            Dataset.access_url == dataset_meta.access_url,
-                        )
-                        .first()
-                    )
-
-                    # Convert bbox tuple to WKT POLYGON (already in EPSG:4326 from adapter)
-                    bbox_geometry = None
-                    if dataset_meta.bbox:
-                        minx, miny, maxx, maxy = dataset_meta.bbox
-                        bbox_wkt = f"POLYGON(({minx} {miny},{maxx} {miny},{maxx} {maxy},{minx} {maxy},{minx} {miny}))"
-                        # Bbox is already in WGS84 (transformed by adapter), so create geometry directly in EPSG:4326
-                        bbox_geometry = func.ST_GeomFromText(bbox_wkt, 4326)
-
-                    if existing:
-                        # Update existing dataset
-                        existing.name = dataset_meta.name
-                        existing.description = dataset_meta.description
-                        existing.feature_count = dataset_meta.feature_count
-                        existing.bbox = bbox_geometry
-                        existing.keywords = dataset_meta.keywords
-                        existing.updated_at = datetime.utcnow()
-                        existing.service_item_id = dataset_meta.service_item_id
-                        existing.geometry_type = dataset_meta.geometry_type
-                        existing.source_srid = dataset_meta.source_srid
-                        existing.max_record_count = dataset_meta.max_record_count
-                        existing.last_edit_date = dataset_meta.last_edit_date
-                        existing.themes = dataset_meta.themes
-
-                        if dataset_meta.source_metadata:
-                            existing.source_metadata = json.dumps(dataset_meta.source_metadata) if isinstance(dataset_meta.source_metadata, dict) else dataset_meta.source_metadata
-                    else:
-                        # Create new dataset
-                        source_metadata_str = None
-                        if dataset_meta.source_metadata:
-                            source_metadata_str = json.dumps(dataset_meta.source_metadata) if isinstance(dataset_meta.source_metadata, dict) else dataset_meta.source_metadata
-
-                        new_dataset = Dataset(
-                            geoserver_id=server_id,
-                            external_id=dataset_meta.external_id,
-                            name=dataset_meta.name,
-                            description=dataset_meta.description,
-                            access_url=dataset_meta.access_url,
-                            feature_count=dataset_meta.feature_count,
-                            bbox=bbox_geometry,
-                            keywords=dataset_meta.keywords,
-                            is_active=True,
-                            service_item_id=dataset_meta.service_item_id,
-                            geometry_type=dataset_meta.geometry_type,
-                            source_srid=dataset_meta.source_srid,
-                            max_record_count=dataset_meta.max_record_count,
-                            last_edit_date=dataset_meta.last_edit_date,
-                            themes=dataset_meta.themes,
-                            source_metadata=source_metadata_str,
-                        )
-                        db.add(new_dataset)
-
-                    datasets_found += 1
-
-                    # Commit every 10 datasets to avoid long-running transactions
-                    if datasets_found % 10 == 0:
-                        db.commit()
-
-                # Final commit
-                db.commit()
+                # Discover layers in this service; upserts overlap the adapter's
+                # HTTP fetches instead of alternating with them
+                queue: asyncio.Queue = asyncio.Queue(maxsize=CRAWL_QUEUE_SIZE)
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(_produce_datasets(adapter, queue))
+                    writer = tg.create_task(_write_datasets(db, server_id, queue))
+                datasets_found, datasets_new = writer.result()
 
                 # Update job progress
                 job.services_processed += 1
                 job.datasets_discovered += datasets_found
+                job.datasets_new += datasets_new
+                job.datasets_updated += datasets_found - datasets_new
                 db.commit()
 
+                # Publish this service's datasets now rather than at finalize,
+                # which may be a long crawl away (or never run if cancelled)
+                if datasets_found:
+                    refresh_materialized_facets(db)
+
                 logger.info(f"Processed service {service_url}: found {datasets_found} datasets")
                 return datasets_found
 
@@ -268,9 +353,69 @@ async def _process_service_async(self, crawl_job_id: str, service_url: str):
             logger.exception(f"Failed to process service {service_url}: {e}")
             # Don't fail the entire job for one service
             db.rollback()
+            # Batches committed before the failure are still visible
+            refresh_materialized_facets(db)
             return 0
 
 
+async def _produce_datasets(adapter: ArcGISAdapter, queue: asyncio.Queue) -> None:
+    """Feed discovered datasets into ``queue``, ending with a ``None`` sentinel."""
+    # On failure no sentinel is sent; the TaskGroup cancels the writer instead
+    async for dataset_meta in adapter.discover_datasets():
+        await queue.put(dataset_meta)
+    await queue.put(None)
+
+
+async def _write_datasets(db, server_id, queue: asyncio.Queue) -> tuple[int, int]:
+    """
+    Drain ``queue`` and upsert datasets until the sentinel arrives.
+
+    A batch is written once it is full, once its first dataset has waited
+    UPSERT_BATCH_SECONDS, or at the sentinel. (Not when the queue runs dry: the
+    adapter awaits HTTP between layers, so that would write one row at a time.)
+    The blocking upsert runs in a thread so the producer keeps fetching
+    meanwhile; only this coroutine touches ``db``, one call at a time.
+
+    Returns:
+        (datasets written, datasets newly inserted)
+    """
+    loop = asyncio.get_running_loop()
+    found = new = 0
+    batch: list[DatasetMetadata] = []
+    deadline = None
+    done = False
+    while not done:
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        try:
+            dataset_meta = await asyncio.wait_for(queue.get(), timeout)
+        except asyncio.TimeoutError:
+            pass  # The partial batch is due; write it below
+        else:
+            if dataset_meta is None:
+                done = True
+            else:
+                if deadline is None:
+                    deadline = loop.time() + UPSERT_BATCH_SECONDS
+                batch.append(dataset_meta)
+
+        due = deadline is not None and loop.time() >= deadline
+        if batch and (done or due or len(batch) >= UPSERT_BATCH_SIZE):
+            new += await asyncio.to_thread(_upsert_datasets, db, server_id, batch)
+            await asyncio.to_thread(db.commit)
+            found += len(batch)
+            batch = []
+            deadline = None
+
+    return found, new
+
+
+@celery_app.task(name="crawl.refresh_facets")
+def refresh_facets():
+    """Refresh the search facet view outside the request that changed datasets."""
+    with get_db_session() as db:
+        refresh_materialized_facets(db)
+
+
 @celery_app.task(name="crawl.finalize_job")
 def finalize_crawl_job(crawl_job_id: str):
     """
@@ -312,6 +457,8 @@ def finalize_crawl_job(crawl_job_id: str):
         job.current_stage = "complete"
         db.commit()
 
+        refresh_materialized_facets(db)
+
         duration = (job.completed_at - job.started_at).total_seconds()
         logger.info(
             f"Crawl job {crawl_job_id} completed: "
@@ -2,10 +2,13 @@
 
 import asyncio
 import logging
+import time
 from datetime import datetime
+from typing import Callable
 from uuid import UUID
 
 from celery import group, chord
+from sqlalchemy import update
 
 from ..celery_app import celery_app
 from ..celery_utils import get_db_session
@@ -15,6 +18,41 @@ from spheraform_core.adapters import ArcGISAdapter
 
 logger = logging.getLogger("gunicorn.error")
 
+# Progress is flushed to the database at most this often (features / seconds)
+PROGRESS_FLUSH_FEATURES = 1000
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+def _progress_writer(db, job: DownloadJob) -> Callable[[int, int], None]:
+    """
+    Build a download progress callback that batches job updates.
+
+    Progress is kept on the job in memory and only committed once
+    PROGRESS_FLUSH_FEATURES features or PROGRESS_FLUSH_SECONDS have passed
+    since the last flush (and always on the final page), so a fast download
+    doesn't turn into one UPDATE per page.
+    """
+    last_flush = {"features": 0, "at": time.monotonic()}
+
+    def update_progress(current: int, total: int):
+        """Update job progress, flushing to the database in batches."""
+        if not job.total_features:
+            job.total_features = total
+        job.features_downloaded = current
+
+        now = time.monotonic()
+        if (
+            current >= total
+            or current - last_flush["features"] >= PROGRESS_FLUSH_FEATURES
+            or now - last_flush["at"] >= PROGRESS_FLUSH_SECONDS
+        ):
+            logger.debug(f"Flushing progress for job {job.id}: {current}/{total}")
+            db.commit()
+            last_flush["features"] = current
+            last_flush["at"] = now
+
+    return update_progress
+
 
 @celery_app.task(bind=True, name="download.process_job")
 def process_download_job(self, job_id: str):
@@ -29,20 +67,32 @@ def process_download_job(self, job_id: str):
         Task result or spawns subtasks
     """
     with get_db_session() as db:
-        job = db.query(DownloadJob).filter(DownloadJob.id == job_id).first()
+        job = db.query(DownloadJob).filter(DownloadJob.id == UUID(job_id)).first()
         if not job:
             raise ValueError(f"Download job {job_id} not found")
 
+        # Claim the job: only a still-pending job moves to RUNNING. One that was
+        # abandoned (or cancelled) while queued stays as it is, so it can't clash
+        # with a newer in-flight job for the same request on ix_download_jobs_inflight
+        claimed = db.execute(
+            update(DownloadJob)
+            .where(DownloadJob.id == job.id, DownloadJob.status == JobStatus.PENDING)
+            .values(
+                status=JobStatus.RUNNING,
+                started_at=datetime.utcnow(),
+                current_stage="routing",
+            )
+        ).rowcount
+        db.commit()
+        if not claimed:
+            logger.info(f"Download job {job_id} is no longer pending, skipping")
+            return None
+        db.refresh(job)
+
         dataset = db.query(Dataset).filter(Dataset.id == job.dataset_id).first()
         if not dataset:
             raise ValueError(f"Dataset {job.dataset_id} not found")
 
-        # Update status
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
-        job.current_stage = "routing"
-        db.commit()
-
         logger.info(f"Processing download job {job_id} with strategy {dataset.download_strategy}")
 
         # Strategy selection
@@ -86,28 +136,13 @@ def download_simple(job_id: str):
             job.current_stage = "downloading"
             db.commit()
 
-            # Create progress callback that updates database
-            def update_progress(current: int, total: int):
-                """Update job progress in database."""
-                logger.info(f"Progress callback invoked: {current}/{total} features")
-                if not job.total_features:
-                    job.total_features = total
-                    logger.info(f"Set total_features to {total}")
-                job.features_downloaded = current
-                logger.info(f"Set features_downloaded to {current}")
-                # Only commit every 1000 features to reduce database load
-                if current % 1000 == 0 or current == total:
-                    logger.info(f"Committing progress update at {current}/{total}")
-                    db.commit()
-                    logger.info(f"Successfully committed progress")
-
             # Run async code in event loop
             result = asyncio.run(download_service.download_and_cache(
                 dataset_id=dataset.id,
                 geometry=job.params.get("geometry"),
                 format=job.params.get("format", "geojson"),
                 job_id=UUID(job_id),
-                progress_callback=update_progress,
+                progress_callback=_progress_writer(db, job),
             ))
 
             # Mark job as completed
@@ -158,28 +193,13 @@ def download_paged(job_id: str):
             job.current_stage = "downloading"
             db.commit()
 
-            # Create progress callback that updates database
-            def update_progress(current: int, total: int):
-                """Update job progress in database."""
-                logger.info(f"Progress callback invoked: {current}/{total} features")
-                if not job.total_features:
-                    job.total_features = total
-                    logger.info(f"Set total_features to {total}")
-                job.features_downloaded = current
-                logger.info(f"Set features_downloaded to {current}")
-                # Only commit every 1000 features to reduce database load
-                if current % 1000 == 0 or current == total:
-                    logger.info(f"Committing progress update at {current}/{total}")
-                    db.commit()
-                    logger.info(f"Successfully committed progress")
-
             # Run async code in event loop
             result = asyncio.run(download_service.download_and_cache(
                 dataset_id=dataset.id,
                 geometry=job.params.get("geometry"),
                 format=job.params.get("format", "geojson"),
                 job_id=UUID(job_id),
-                progress_callback=update_progress,
+                progress_callback=_progress_writer(db, job),
             ))
 
             # Mark job as completed
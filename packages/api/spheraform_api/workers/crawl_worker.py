@@ -21,6 +21,8 @@ from spheraform_core.models import (
 )
 from spheraform_core.adapters import ArcGISAdapter
 
+from ..facet_cache import refresh_materialized_facets
+
 logger = logging.getLogger("gunicorn.error")
 
 
@@ -86,6 +88,8 @@ class CrawlWorker:
                 job.completed_at = datetime.utcnow()
                 job.current_stage = "failed"
                 db.commit()
+                # The crawl may have written datasets before it failed
+                refresh_materialized_facets(db)
 
     async def _process_job(self, db: Session, job: CrawlJob):
         """
@@ -270,6 +274,8 @@ class CrawlWorker:
                 job.current_stage = "complete"
                 db.commit()
 
+                refresh_materialized_facets(db)
+
                 duration = (job.completed_at - job.started_at).total_seconds()
                 logger.info(
                     f"Crawl job {job.id} completed: "
@@ -6,6 +6,9 @@ from datetime import datetime
 from typing import AsyncIterator, Optional, Dict, Callable
 import uuid
 import httpx
+import orjson
+from shapely.geometry import shape
+from shapely.prepared import prep
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .base import (
@@ -21,6 +24,42 @@ from .theme_classifier import ThemeClassifier
 
 logger = logging.getLogger("gunicorn.error")
 
+
+def _envelope_filter(geometry: dict) -> tuple[dict, Callable[[dict], bool]]:
+    """
+    Split a GeoJSON clip geometry into a cheap server-side filter and an exact test.
+
+    The bounding box is sent to ArcGIS as an envelope so the server can use its
+    spatial index; only features that survive it are tested against the exact
+    (prepared) geometry client-side.
+
+    Returns:
+        (query params for the envelope, predicate(feature) -> bool)
+    """
+    clip = shape(geometry)
+    minx, miny, maxx, maxy = clip.bounds
+    params = {
+        "geometry": f"{minx},{miny},{maxx},{maxy}",
+        "geometryType": "esriGeometryEnvelope",
+        "inSR": "4326",
+        "spatialRel": "esriSpatialRelIntersects",
+    }
+
+    # An axis-aligned rectangle is fully answered by the envelope query
+    if clip.equals(clip.envelope):
+        return params, lambda feature: True
+
+    prepared = prep(clip)
+
+    def intersects(feature: dict) -> bool:
+        feature_geometry = feature.get("geometry")
+        if not feature_geometry:
+            return False
+        return prepared.intersects(shape(feature_geometry))
+
+    return params, intersects
+
+
 class ArcGISAdapter(BaseGeoserverAdapter):
     """
     Adapter for ArcGIS REST API servers.
@@ -35,6 +74,7 @@ class ArcGISAdapter(BaseGeoserverAdapter):
         base_url: str,
         connection_config: Optional[Dict] = None,
         country_hint: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
         **kwargs
     ):
         super().__init__(base_url, **kwargs)
@@ -80,6 +120,10 @@ class ArcGISAdapter(BaseGeoserverAdapter):
             # httpx AsyncClient uses 'proxy' parameter with a URL string
             client_kwargs["proxy"] = proxy_url
 
+        # Custom transport (e.g. httpx.MockTransport in tests) replaces the network layer
+        if transport is not None:
+            client_kwargs["transport"] = transport
+
         self.client = httpx.AsyncClient(**client_kwargs)
 
     async def __aenter__(self):
@@ -551,21 +595,24 @@ class ArcGISAdapter(BaseGeoserverAdapter):
                 "outFields": "*",  # Get all fields
                 "returnGeometry": "true",
                 "outSR": "4326",  # WGS84
-                "f": "geojson" if format == "geojson" else "json",
+                # The local clip test reads GeoJSON geometries, not Esri JSON ones
+                "f": "geojson" if format == "geojson" or geometry else "json",
             }
 
-            # Add spatial filter if provided
+            # Add spatial filter if provided: bbox on the server, exact geometry locally
             if geometry:
-                # TODO: Convert GeoJSON geometry to ArcGIS geometry format
-                pass
+                envelope_params, keep = _envelope_filter(geometry)
+                params.update(envelope_params)
 
             # Use _request with retry logic instead of direct client call
             geojson = await self._request(layer_url, params=params)
 
+            if geometry and geojson.get("features"):
+                geojson["features"] = [f for f in geojson["features"] if keep(f)]
+
             # Write to file
-            import json
-            with open(output_path, "w") as f:
-                json.dump(geojson, f)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(geojson))
 
             import os
             size_bytes = os.path.getsize(output_path)
@@ -615,33 +662,39 @@ class ArcGISAdapter(BaseGeoserverAdapter):
             page_size = max_records if max_records else 1000
             logger.info(f"Using page size {page_size} for download")
 
+            # Spatial filter: bbox pushed to the server, exact geometry tested locally
+            envelope_params = {}
+            keep = None
+            if geometry:
+                envelope_params, keep = _envelope_filter(geometry)
+
             # Get total count first
             count_params = {
                 "where": "1=1",
                 "returnCountOnly": "true",
                 "f": "json",
+                **envelope_params,
             }
             count_result = await self._request(query_url, count_params)
             total_count = count_result.get("count", 0)
 
             if total_count == 0:
                 # Empty dataset, write empty FeatureCollection
-                import json
-                with open(output_path, "w") as f:
-                    json.dump({"type": "FeatureCollection", "features": []}, f)
+                with open(output_path, "wb") as f:
+                    f.write(orjson.dumps({"type": "FeatureCollection", "features": []}))
                 return DownloadResult(success=True, output_path=output_path, size_bytes=0, feature_count=0)
 
             # Stream write features to avoid memory issues with large datasets
-            import json
             offset = 0
+            logged_offset = 0
             feature_count = 0
             consecutive_connection_errors = 0
 
             # Open file and write GeoJSON header
-            with open(output_path, "w") as f:
-                f.write('{"type": "FeatureCollection", "features": [')
+            with open(output_path, "wb") as f:
+                f.write(b'{"type":"FeatureCollection","features":[\n')
 
-                first_batch = True
+                first_feature = True
 
                 while offset < total_count:
                     params = {
@@ -652,13 +705,9 @@ class ArcGISAdapter(BaseGeoserverAdapter):
                         "resultOffset": str(offset),
                         "resultRecordCount": str(page_size),
                         "f": "geojson",
+                        **envelope_params,
                     }
 
-                    # Add spatial filter if provided
-                    if geometry:
-                        # TODO: Convert GeoJSON geometry to ArcGIS geometry format
-                        pass
-
                     # Use _request with retry logic, but catch connection errors to reduce page size
                     logger.info(f"Fetching features {offset}-{offset+page_size} of {total_count}")
 
@@ -688,29 +737,35 @@ class ArcGISAdapter(BaseGeoserverAdapter):
                     if not features:
                         break
 
-                    # Write features to file immediately (streaming)
-                    for i, feature in enumerate(features):
-                        # Add comma between features (but not before first)
-                        if not first_batch or i > 0:
-                            f.write(',')
-                        else:
-                            first_batch = False
+                    # Offset advances by what the server returned, not what survives the clip
+                    offset += len(features)
+                    if keep:
+                        features = [feature for feature in features if keep(feature)]
 
-                        json.dump(feature, f)
+                    # Write features to file immediately (streaming), one encoded feature per line
+                    for feature in features:
+                        # Add comma between features (but not before first)
+                        if not first_feature:
+                            f.write(b",\n")
+                        f.write(orjson.dumps(feature))
+                        first_feature = False
                         feature_count += 1
 
-                    offset += len(features)
-
-                    # Call progress callback after each batch
+                    # Call progress callback after each batch (offset, so clipping can't stall it)
                     if progress_callback:
-                        progress_callback(feature_count, total_count)
-
-                    # Log progress every 10k features
-                    if feature_count % 10000 == 0:
-                        logger.info(f"Streamed {feature_count:,} / {total_count:,} features ({(feature_count/total_count)*100:.1f}%)")
+                        progress_callback(offset, total_count)
+
+                    # Log progress each time the offset passes another 10k features
+                    # (kept features can stay flat for many pages under a clip)
+                    if offset // 10000 > logged_offset // 10000:
+                        logged_offset = offset
+                        logger.info(
+                            f"Fetched {offset:,} / {total_count:,} features "
+                            f"({(offset/total_count)*100:.1f}%), kept {feature_count:,}"
+                        )
 
                 # Write GeoJSON footer
-                f.write(']}')
+                f.write(b"\n]}\n")
 
             import os
             size_bytes = os.path.getsize(output_path)
@@ -923,14 +978,13 @@ class ArcGISAdapter(BaseGeoserverAdapter):
                     all_features.extend(features)
 
             # Write complete GeoJSON
-            import json
             result_geojson = {
                 "type": "FeatureCollection",
                 "features": all_features
             }
 
-            with open(output_path, "w") as f:
-                json.dump(result_geojson, f)
+            with open(output_path, "wb") as f:
+                f.write(orjson.dumps(result_geojson))
 
             import os
             size_bytes = os.path.getsize(output_path)
@@ -1,7 +1,7 @@
 """Configuration management using pydantic-settings."""
 
-from typing import Optional
-from pydantic import Field
+from typing import Any, Optional
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,6 +21,59 @@ class Settings(BaseSettings):
         description="PostgreSQL connection URL",
     )
 
+    # Connection pools. Each API process opens the async and sync engines, so
+    # its ceiling is (db_pool_size + db_max_overflow) + (db_sync_pool_size +
+    # db_sync_max_overflow) = 90 by default; multiply by api_workers. Each Celery
+    # worker process (celery_*_concurrency per worker) adds up to
+    # celery_db_pool_size + celery_db_max_overflow = 30. Keep the sum across all
+    # processes under the server's max_connections.
+    db_pool_size: int = Field(
+        default=20,
+        description="Connections kept open by each API process's async engine",
+    )
+    db_max_overflow: int = Field(
+        default=40,
+        description=(
+            "Extra async-engine connections beyond db_pool_size under load; "
+            "up to 60 per API process by default"
+        ),
+    )
+    db_sync_pool_size: int = Field(
+        default=10,
+        description="Connections kept open by each API process's sync engine",
+    )
+    db_sync_max_overflow: int = Field(
+        default=20,
+        description=(
+            "Extra sync-engine connections beyond db_sync_pool_size; "
+            "up to 30 per API process by default"
+        ),
+    )
+    celery_db_pool_size: int = Field(
+        default=10, description="Connections kept open by each Celery worker process"
+    )
+    celery_db_max_overflow: int = Field(
+        default=20,
+        description=(
+            "Extra connections per Celery worker process beyond celery_db_pool_size; "
+            "up to 30 per process by default"
+        ),
+    )
+    db_pool_recycle: int = Field(
+        default=1800, description="Seconds before a pooled connection is replaced"
+    )
+    db_prepare_threshold: Optional[int] = Field(
+        default=2,
+        description=(
+            "Executions of the same query on a connection before psycopg prepares it "
+            "server-side; 0 or empty to disable (required behind PgBouncer transaction pooling)"
+        ),
+    )
+    db_null_pool: bool = Field(
+        default=False,
+        description="Open a fresh connection per checkout (no pooling); used by the test suite",
+    )
+
     # Redis
     redis_url: str = Field(
         default="redis://localhost:6379/0",
@@ -68,6 +121,14 @@ class Settings(BaseSettings):
         default=0, description="Minimum zoom level for PMTiles generation"
     )
 
+    @field_validator("db_prepare_threshold", mode="before")
+    @classmethod
+    def disable_prepare_threshold(cls, value: Any) -> Any:
+        """Map 0 or an empty value to None (psycopg: never prepare server-side)."""
+        if value is None or str(value).strip().lower() in ("", "0", "none", "null"):
+            return None
+        return value
+
     @property
     def is_r2(self) -> bool:
         """Check if Cloudflare R2 is configured."""
@@ -116,6 +177,13 @@ class Settings(BaseSettings):
     default_download_timeout: int = Field(
         default=300, description="Default download timeout in seconds"
     )
+    download_inflight_timeout: int = Field(
+        default=3600,
+        description=(
+            "Seconds without progress after which a pending/running download job is "
+            "treated as abandoned instead of being reused by identical requests"
+        ),
+    )
     max_concurrent_downloads_per_server: int = Field(
         default=5, description="Max parallel downloads per server"
     )
@@ -1,6 +1,9 @@
 """Database connection and session management."""
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from typing import Generator
@@ -8,13 +11,56 @@ from typing import Generator
 from .config import settings
 from .models.base import Base
 
+
+def database_url() -> str:
+    """
+    Configured database URL, pinned to the psycopg (v3) driver.
+
+    psycopg2 is not installed, and psycopg 3 is what provides automatic
+    server-side prepared statements (see engine_options).
+    """
+    url = str(settings.database_url)
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", "postgresql+psycopg://", 1)
+    elif url.startswith("postgresql+psycopg2://"):
+        url = url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
+    return url
+
+
+def engine_options(pool_size: int, max_overflow: int) -> dict:
+    """
+    Pool and driver keyword arguments for create_engine/create_async_engine.
+
+    Each engine passes its own pool size and overflow from settings (see the
+    connection budget in config.py); DB_POOL_RECYCLE applies to all of them.
+    With DB_NULL_POOL set (the test suite does), connections are never reused.
+
+    psycopg prepares a statement server-side once it has run
+    DB_PREPARE_THRESHOLD times on a connection, so repeated queries (search,
+    job polling) skip parse/plan. SQLAlchemy's compiled cache keeps the SQL
+    text identical between calls, which is what psycopg keys the cache on.
+    DB_PREPARE_THRESHOLD=0 (or empty) disables this, e.g. behind PgBouncer in
+    transaction pooling mode. Other drivers don't take the argument.
+    """
+    options = {}
+    if make_url(database_url()).get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+    if settings.db_null_pool:
+        return {**options, "poolclass": NullPool}
+    return {
+        **options,
+        "pool_pre_ping": True,  # Verify connections before using
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
 # Create engine
 engine = create_engine(
-    str(settings.database_url),
+    database_url(),
     echo=False,
-    pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,
-    max_overflow=20,
+    **engine_options(settings.db_sync_pool_size, settings.db_sync_max_overflow),
 )
 
 # Create session factory
@@ -24,6 +70,21 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Async engine for FastAPI routes (psycopg 3 async driver, same URL)
+async_engine = create_async_engine(
+    database_url(),
+    echo=False,
+    **engine_options(settings.db_pool_size, settings.db_max_overflow),
+)
+
+# Objects stay usable after commit; lazy refreshes would need a greenlet context
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 @contextmanager
 def get_db() -> Generator[Session, None, None]:
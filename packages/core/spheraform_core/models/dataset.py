@@ -1,7 +1,7 @@
 """Dataset model - unified catalogue of discovered datasets."""
 
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import uuid
 from sqlalchemy import (
     String,
@@ -19,6 +19,9 @@ import enum
 
 from .base import Base, TimestampMixin, UUIDMixin, ArrayOfText
 
+if TYPE_CHECKING:
+    from .geoserver import Geoserver
+
 
 class DownloadStrategy(str, enum.Enum):
     """Download strategy based on dataset size."""
@@ -170,8 +173,8 @@ class Dataset(Base, UUIDMixin, TimestampMixin):
         Text, nullable=True
     )  # Store raw metadata JSON as text
 
-    # Relationships
-    # geoserver = relationship("Geoserver", back_populates="datasets")
+    # Relationships (one-way; load with joinedload/selectinload where needed)
+    geoserver: Mapped["Geoserver"] = relationship("Geoserver")
 
     def __repr__(self) -> str:
         return f"<Dataset(name='{self.name}', external_id='{self.external_id}', features={self.feature_count})>"
@@ -184,6 +187,14 @@ Index(
     Dataset.is_active,
 )
 
+# Identity of a crawled dataset; conflict target for the crawl upsert
+Index(
+    "uq_datasets_geoserver_access_url",
+    Dataset.geoserver_id,
+    Dataset.access_url,
+    unique=True,
+)
+
 Index(
     "ix_datasets_themes_active",
     Dataset.themes,
@@ -191,6 +202,27 @@ Index(
     postgresql_using="gin",  # GIN index for array searches
 )
 
+Index(
+    "ix_datasets_keywords",
+    Dataset.keywords,
+    postgresql_using="gin",  # GIN index for keyword containment/overlap
+)
+
+# Partial indexes over active datasets only: search always filters on
+# is_active = true, so these are smaller than their full-table counterparts
+Index(
+    "ix_datasets_active_geoserver",
+    Dataset.geoserver_id,
+    postgresql_where=Dataset.is_active == True,
+)
+
+Index(
+    "ix_datasets_active_themes",
+    Dataset.themes,
+    postgresql_using="gin",
+    postgresql_where=Dataset.is_active == True,
+)
+
 # Spatial index on bbox
 Index(
     "ix_datasets_bbox",
@@ -48,6 +48,7 @@ class Geoserver(Base, UUIDMixin, TimestampMixin):
     provider_type: Mapped[ProviderType] = mapped_column(
         SQLEnum(ProviderType, name="provider_type", values_callable=lambda x: [e.value for e in x]),
         nullable=False,
+        index=True,
     )
 
     # Authentication (encrypted credentials stored as JSON)
@@ -1,7 +1,7 @@
 """Job models - background jobs for downloads and exports."""
 
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import uuid
 from sqlalchemy import (
     String,
@@ -13,12 +13,15 @@ from sqlalchemy import (
     JSON,
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from geoalchemy2 import Geometry
 import enum
 
 from .base import Base, TimestampMixin, UUIDMixin, JSONType, ArrayOfUUID
 
+if TYPE_CHECKING:
+    from .dataset import Dataset
+
 
 class JobStatus(str, enum.Enum):
     """Status of a background job."""
@@ -108,10 +111,27 @@ class DownloadJob(Base, UUIDMixin, TimestampMixin):
     params: Mapped[Optional[dict]] = mapped_column(JSONType, nullable=True)
     # Example params: {"clip_geometry": {...}, "crs": "EPSG:4326"}
 
+    # SHA-256 of the canonicalised request params, used to coalesce identical
+    # in-flight downloads onto a single job
+    request_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+
+    # Relationships (one-way; load with joinedload/selectinload where needed)
+    dataset: Mapped["Dataset"] = relationship("Dataset")
+
     def __repr__(self) -> str:
         return f"<DownloadJob(dataset_id={self.dataset_id}, status='{self.status}', progress={self.chunks_completed}/{self.total_chunks})>"
 
 
+# Only one pending/running job may exist per request hash; finished jobs don't conflict
+Index(
+    "ix_download_jobs_inflight",
+    DownloadJob.request_hash,
+    unique=True,
+    postgresql_where=DownloadJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING]),
+    sqlite_where=DownloadJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING]),
+)
+
+
 class DownloadChunk(Base, UUIDMixin):
     """
     Individual chunks for resumable large downloads.
@@ -2,7 +2,7 @@
 
 from typing import Optional
 from sqlalchemy import String, Text, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base, ArrayOfText
 
@@ -35,6 +35,10 @@ class Theme(Base):
         ForeignKey("themes.code", ondelete="SET NULL"),
         nullable=True,
     )
+    parent: Mapped[Optional["Theme"]] = relationship(
+        "Theme", remote_side=[code], back_populates="children"
+    )
+    children: Mapped[list["Theme"]] = relationship("Theme", back_populates="parent")
 
     # Icon or color for UI
     icon: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -343,15 +343,6 @@ class PostGISStorageBackend(StorageBackend):
             features = ijson.items(f, "features.item")
 
             for feature in features:
-                # Check if job was cancelled
-                if job_id and feature_count % 1000 == 0:
-                    job = self.db.query(DownloadJob).filter(DownloadJob.id == job_id).first()
-                    if job and job.status == JobStatus.CANCELLED:
-                        logger.info(f"Download job {job_id} was cancelled, stopping storage")
-                        self.db.execute(text(f"DROP TABLE IF EXISTS {cache_table}"))
-                        self.db.commit()
-                        return feature_count
-
                 batch.append(feature)
                 feature_count += 1
 
@@ -360,9 +351,14 @@ class PostGISStorageBackend(StorageBackend):
                     self._insert_batch(cache_table, batch)
                     batch = []
 
-                    # Update progress
+                    # One job read per batch covers both cancellation and progress
                     if job_id:
                         job = self.db.query(DownloadJob).filter(DownloadJob.id == job_id).first()
+                        if job and job.status == JobStatus.CANCELLED:
+                            logger.info(f"Download job {job_id} was cancelled, stopping storage")
+                            self.db.execute(text(f"DROP TABLE IF EXISTS {cache_table}"))
+                            self.db.commit()
+                            return feature_count
                         if job:
                             if not job.total_features:
                                 job.total_features = feature_count  # Will be updated as we stream
@@ -400,23 +396,27 @@ class PostGISStorageBackend(StorageBackend):
         return feature_count
 
     def _insert_batch(self, cache_table: str, batch: list):
-        """Insert a batch of features into PostGIS table."""
-        for feature in batch:
-            # Convert Decimal to float for JSON serialization
-            geometry_json = json.dumps(feature.get("geometry"), default=float)
-            properties_json = json.dumps(feature.get("properties", {}), default=float)
-
-            # Transform from 4326 (WGS84) to 3857 (Web Mercator) for Martin
-            insert_sql = f"""
-            INSERT INTO {cache_table} (geom, properties)
-            VALUES (
-                ST_Transform(ST_GeomFromGeoJSON(:geometry), 3857),
-                CAST(:properties AS jsonb)
-            )
-            """
-            self.db.execute(
-                text(insert_sql), {"geometry": geometry_json, "properties": properties_json}
-            )
+        """Insert a batch of features into PostGIS table in a single executemany."""
+        # Transform from 4326 (WGS84) to 3857 (Web Mercator) for Martin
+        insert_sql = f"""
+        INSERT INTO {cache_table} (geom, properties)
+        VALUES (
+            ST_Transform(ST_GeomFromGeoJSON(:geometry), 3857),
+            CAST(:properties AS jsonb)
+        )
+        """
+
+        # Convert Decimal to float for JSON serialization
+        rows = [
+            {
+                "geometry": json.dumps(feature.get("geometry"), default=float),
+                "properties": json.dumps(feature.get("properties", {}), default=float),
+            }
+            for feature in batch
+        ]
+
+        # One round trip per batch: psycopg 3 pipelines executemany parameter sets
+        self.db.execute(text(insert_sql), rows)
 
 
 class S3StorageBackend(StorageBackend):
@@ -1,12 +1,28 @@
 """Pytest configuration and fixtures."""
 
+import hashlib
+import os
+from pathlib import Path
+
+import httpx
 import pytest
 import pytest_asyncio
-from typing import Generator
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from typing import AsyncGenerator, Generator
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
 from fastapi.testclient import TestClient
 
+# No pooling for the application engines under test: pooled connections
+# outliving a test could hold locks against the SAVEPOINT fixtures below.
+# Must be set before spheraform_core.config is imported.
+os.environ.setdefault("DB_NULL_POOL", "true")
+
 # Disable GeoAlchemy2 admin functions for SQLite testing
 # Must be done before importing models
 from geoalchemy2 import admin
@@ -16,50 +32,209 @@ admin.dialects.sqlite.before_drop = lambda *args, **kwargs: None
 
 from spheraform_core.models.base import Base
 from spheraform_core.models import Geoserver, Dataset, DownloadJob, CrawlJob, Theme
+from spheraform_api import facet_cache
 from spheraform_api.main import app
-from spheraform_api.dependencies import get_db
+from spheraform_api.dependencies import get_async_db, get_db
+
+
+# Test database URL (in-memory SQLite for speed by default).
+# Point TEST_DATABASE_URL at a PostGIS server to run against Postgres; each
+# pytest-xdist worker then gets its own database cloned from a migrated template.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
+
+# Every test re-issues the same handful of INSERT/SELECT shapes; size the
+# compiled statement cache so none of them is evicted and recompiled mid-run
+# (SQLAlchemy's default is 500 entries).
+TEST_QUERY_CACHE_SIZE = 1200
+
+
+# Make every foreign key in the test template DEFERRABLE INITIALLY DEFERRED, so
+# FK checks are queued to the (never reached) outer commit instead of probing
+# the referenced index on every INSERT. Tests therefore can't observe FK
+# violations on PostgreSQL, just as they can't on SQLite.
+_DEFER_FOREIGN_KEYS = """
+DO $$
+DECLARE fk record;
+BEGIN
+    FOR fk IN
+        SELECT conrelid::regclass AS tbl, conname FROM pg_constraint
+        WHERE contype = 'f' AND connamespace = 'public'::regnamespace
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %s ALTER CONSTRAINT %I DEFERRABLE INITIALLY DEFERRED',
+            fk.tbl, fk.conname
+        );
+    END LOOP;
+END $$
+"""
+
+
+def _alembic_config() -> Config:
+    """
+    Alembic config for the repository's migrations.
+
+    Built without alembic.ini so env.py leaves pytest's logging alone.
+    """
+    config = Config()
+    config.set_main_option(
+        "script_location", str(Path(__file__).resolve().parents[1] / "alembic")
+    )
+    return config
+
+
+def _schema_fingerprint() -> str:
+    """Short hash of the migration head, so a stale template is never reused."""
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    return hashlib.sha1((head + _DEFER_FOREIGN_KEYS).encode("utf-8")).hexdigest()[:12]
+
+
+def _create_worker_database(url: URL) -> URL:
+    """
+    Clone a per-worker database from a template migrated to alembic head.
+
+    CREATE DATABASE ... TEMPLATE is a file-level copy, so each worker gets a
+    fresh schema in near-constant time. An advisory lock serialises template
+    creation and cloning across workers (cloning fails while the template is
+    in use).
+    """
+    template = f"spheraform_template_{_schema_fingerprint()}"
+    worker_db = f"{url.database}_{os.getenv('PYTEST_XDIST_WORKER', 'master')}"
+
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": template})
+            try:
+                exists = conn.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"), {"name": template}
+                ).scalar()
+                if not exists:
+                    conn.execute(text(f'CREATE DATABASE "{template}"'))
+                    # Migrate rather than create_all: the search vector, facet
+                    # view and trigram/partial indexes only exist in migrations
+                    template_engine = create_engine(url.set(database=template))
+                    with template_engine.begin() as template_conn:
+                        config = _alembic_config()
+                        config.attributes["connection"] = template_conn
+                        command.upgrade(config, "head")
+                        template_conn.execute(text(_DEFER_FOREIGN_KEYS))
+                    template_engine.dispose()
+
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_db}"'))
+                conn.execute(text(f'CREATE DATABASE "{worker_db}" TEMPLATE "{template}"'))
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": template})
+    finally:
+        admin.dispose()
 
+    return url.set(database=worker_db)
 
-# Test database URL (in-memory SQLite for speed)
-TEST_DATABASE_URL = "sqlite:///:memory:"
+
+def _drop_worker_database(url: URL, worker_url: URL) -> None:
+    """Drop a per-worker database created by _create_worker_database."""
+    admin = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{worker_url.database}"'))
+    finally:
+        admin.dispose()
 
 
 @pytest.fixture(scope="session")
 def engine():
     """Create test database engine."""
+    url = make_url(TEST_DATABASE_URL)
+
+    if url.get_backend_name() == "postgresql":
+        worker_url = _create_worker_database(url)
+        # Every test shares session_connection, so the pool never needs more
+        # than that one connection
+        engine = create_engine(
+            worker_url,
+            pool_size=1,
+            max_overflow=0,
+            query_cache_size=TEST_QUERY_CACHE_SIZE,
+            echo=False,
+        )
+        yield engine
+        engine.dispose()
+        _drop_worker_database(url, worker_url)
+        return
+
+    # One DBAPI connection for the whole session: the in-memory database lives
+    # exactly as long as it, and the TestClient's worker thread can use it too
     engine = create_engine(
         TEST_DATABASE_URL,
         connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+        query_cache_size=TEST_QUERY_CACHE_SIZE,
         echo=False,
     )
+
+    # pysqlite's implicit transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    # Schema is created once per session; tests only ever roll back, so the
+    # in-memory database is simply discarded at the end instead of dropped
     Base.metadata.create_all(bind=engine)
     yield engine
-    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
 
 
-@pytest.fixture(scope="function")
-def db_session(engine) -> Generator[Session, None, None]:
-    """Create a new database session for each test."""
-    TestingSessionLocal = sessionmaker(
-        autocommit=False,
+@pytest.fixture(scope="session")
+def session_connection(engine):
+    """
+    Connection holding one outer transaction for the whole test session.
+
+    Tests write inside SAVEPOINTs on it (see db_session) and everything is
+    rolled back when the session finishes.
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+def _savepoint_session(connection) -> Session:
+    """Session whose commit/rollback only touch a SAVEPOINT on the given connection."""
+    return Session(
+        bind=connection,
         autoflush=False,
-        bind=engine,
+        # Nothing else writes to the connection, so reloading every attribute
+        # after a (savepoint) commit would only repeat what's already in memory
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
     )
 
-    session = TestingSessionLocal()
+
+@pytest.fixture(scope="function")
+def db_session(session_connection) -> Generator[Session, None, None]:
+    """
+    Create a new database session for each test.
+
+    The test runs inside a SAVEPOINT on the session connection: commits made
+    by the test (or the API under test) release nested savepoints, and the
+    whole lot is rolled back afterwards.
+    """
+    savepoint = session_connection.begin_nested()
+    session = _savepoint_session(session_connection)
     try:
         yield session
-        session.commit()
-    except Exception:
-        session.rollback()
-        raise
     finally:
         session.close()
+        if savepoint.is_active:
+            savepoint.rollback()
 
 
-@pytest.fixture(scope="function")
-def client(db_session: Session):
-    """Create test client with overridden database dependency."""
+def _override_db_dependencies(db_session: Session) -> None:
+    """Point the app's database dependencies at the test session."""
 
     def override_get_db():
         try:
@@ -67,12 +242,42 @@ def client(db_session: Session):
         finally:
             pass
 
+    async def override_get_async_db():
+        # AsyncSession facade over the test session: same connection and SAVEPOINT,
+        # so async routes see (and roll back with) the test's data
+        yield AsyncSession(sync_session_class=lambda **kw: db_session)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Test data is rolled back, not deleted, so cached facets would outlive it
+    facet_cache.clear()
+
+
+@pytest.fixture(scope="function")
+def client(db_session: Session):
+    """Create test client with overridden database dependency."""
+    _override_db_dependencies(db_session)
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_client(db_session: Session) -> AsyncGenerator[httpx.AsyncClient, None]:
+    """
+    Async test client driving the app in-process through ASGITransport.
+
+    Requests run on the test's event loop, so tests can overlap them with
+    asyncio.gather. Lifespan events (background workers) are not started.
+    """
+    _override_db_dependencies(db_session)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
 # Sample data fixtures
 
 
@@ -92,7 +297,6 @@ def sample_geoserver(db_session: Session) -> Geoserver:
     )
     db_session.add(server)
     db_session.commit()
-    db_session.refresh(server)
     return server
 
 
@@ -120,7 +324,6 @@ def sample_dataset(db_session: Session, sample_geoserver: Geoserver) -> Dataset:
     )
     db_session.add(dataset)
     db_session.commit()
-    db_session.refresh(dataset)
     return dataset
 
 
@@ -155,7 +358,8 @@ def sample_themes(db_session: Session) -> list[Theme]:
     return themes
 
 
-# Mock HTTP responses for adapter tests
+# Mock HTTP responses for adapter tests. Function-scoped: the adapter filters
+# and re-serialises payloads in place, so each test gets a fresh copy.
 
 
 @pytest.fixture
@@ -256,3 +460,50 @@ def mock_arcgis_oid_range_response():
             }
         ]
     }
+
+
+@pytest.fixture(scope="session")
+def mock_arcgis_transport() -> httpx.MockTransport:
+    """
+    In-process ArcGIS REST server for ArcGISAdapter(transport=...).
+
+    Routes by URL path so the real adapter code runs end to end without
+    touching the network. Built once per session.
+    """
+    features = [
+        {
+            "type": "Feature",
+            "id": 1,
+            "geometry": {"type": "Point", "coordinates": [-122.4, 37.8]},
+            "properties": {"OBJECTID": 1, "CITY_NAME": "San Francisco", "POP": 883305},
+        },
+        {
+            "type": "Feature",
+            "id": 2,
+            "geometry": {"type": "Point", "coordinates": [-118.2, 34.0]},
+            "properties": {"OBJECTID": 2, "CITY_NAME": "Los Angeles", "POP": 3979576},
+        },
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/query"):
+            if request.url.params.get("returnCountOnly") == "true":
+                return httpx.Response(200, json={"count": len(features)})
+            offset = int(request.url.params.get("resultOffset", 0))
+            return httpx.Response(
+                200,
+                json={"type": "FeatureCollection", "features": features[offset:]},
+            )
+        return httpx.Response(
+            200,
+            json={
+                "id": 0,
+                "name": "Cities",
+                "type": "Feature Layer",
+                "geometryType": "esriGeometryPoint",
+                "maxRecordCount": 2000,
+                "fields": [{"name": "OBJECTID", "type": "esriFieldTypeOID"}],
+            },
+        )
+
+    return httpx.MockTransport(handler)
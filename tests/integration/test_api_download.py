@@ -12,40 +12,45 @@ from spheraform_core.models import Dataset, DownloadJob, JobStatus
 class TestDownloadAPI:
     """Tests for /download endpoint."""
 
-    @pytest.mark.asyncio
-    async def test_download_small_dataset(
-        self, client: TestClient, sample_dataset: Dataset, db_session: Session
+    def test_download_small_dataset(
+        self,
+        client: TestClient,
+        sample_dataset: Dataset,
+        mock_arcgis_transport,
+        monkeypatch,
     ):
         """Test downloading a small dataset directly."""
-        from spheraform_core.adapters.base import DownloadResult
+        from functools import partial
+        from spheraform_core.adapters import ArcGISAdapter
 
-        # Mock adapter to return small dataset
-        mock_result = DownloadResult(
-            success=True,
-            output_path="/tmp/test.geojson",
-            size_bytes=1024,
+        # Real adapter, network served in-process by the mock transport
+        monkeypatch.setattr(
+            "spheraform_api.services.download.ArcGISAdapter",
+            partial(ArcGISAdapter, transport=mock_arcgis_transport),
+        )
+        # PostGIS DDL can't run against the SQLite test database
+        monkeypatch.setattr(
+            "spheraform_api.services.download.PostGISStorageBackend.store_dataset",
+            AsyncMock(
+                return_value={
+                    "cache_table": f"cache_{sample_dataset.id.hex}",
+                    "feature_count": 2,
+                    "size_bytes": 1024,
+                }
+            ),
         )
 
-        with patch(
-            "spheraform_api.routers.download.ArcGISAdapter"
-        ) as mock_adapter_class:
-            mock_adapter = AsyncMock()
-            mock_adapter.download_simple.return_value = mock_result
-            mock_adapter.__aenter__.return_value = mock_adapter
-            mock_adapter.__aexit__.return_value = None
-            mock_adapter_class.return_value = mock_adapter
-
-            download_request = {
-                "dataset_ids": [str(sample_dataset.id)],
-                "format": "geojson",
-            }
-
-            response = client.post("/download/", json=download_request)
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "completed"
-            assert "download_url" in data
+        download_request = {
+            "dataset_ids": [str(sample_dataset.id)],
+            "format": "geojson",
+        }
+
+        response = client.post("/api/v1/download", json=download_request)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert "download_url" in data
 
     @pytest.mark.asyncio
     async def test_download_large_dataset_creates_job(
@@ -80,6 +85,112 @@ class TestDownloadAPI:
         assert job is not None
         assert job.status == JobStatus.PENDING
 
+    def test_identical_inflight_downloads_share_job(
+        self, client: TestClient, db_session: Session, sample_geoserver
+    ):
+        """Test that an identical request made while a job is in flight reuses that job."""
+        from spheraform_core.models import DownloadStrategy
+
+        chunked_dataset = Dataset(
+            geoserver_id=sample_geoserver.id,
+            external_id="0",
+            name="Chunked Dataset",
+            access_url="https://test.com/0",
+            feature_count=500000,
+            download_strategy=DownloadStrategy.CHUNKED,
+        )
+        db_session.add(chunked_dataset)
+        db_session.commit()
+
+        download_request = {
+            "dataset_ids": [str(chunked_dataset.id)],
+            "format": "geojson",
+        }
+
+        first = client.post("/api/v1/download", json=download_request)
+        second = client.post("/api/v1/download", json=download_request)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json()["job_id"] == second.json()["job_id"]
+
+        jobs = db_session.query(DownloadJob).filter_by(dataset_id=chunked_dataset.id).all()
+        assert len(jobs) == 1
+        assert jobs[0].request_hash is not None
+
+    def test_stale_inflight_download_is_not_reused(
+        self, client: TestClient, db_session: Session, sample_geoserver
+    ):
+        """Test that an in-flight job with no recent progress is abandoned, not reused."""
+        from datetime import datetime, timedelta
+        from uuid import UUID
+        from spheraform_core.models import DownloadStrategy
+
+        chunked_dataset = Dataset(
+            geoserver_id=sample_geoserver.id,
+            external_id="0",
+            name="Chunked Dataset",
+            access_url="https://test.com/0",
+            feature_count=500000,
+            download_strategy=DownloadStrategy.CHUNKED,
+        )
+        db_session.add(chunked_dataset)
+        db_session.commit()
+
+        download_request = {
+            "dataset_ids": [str(chunked_dataset.id)],
+            "format": "geojson",
+        }
+
+        first = client.post("/api/v1/download", json=download_request)
+
+        # Simulate a job whose task was lost: still pending, but untouched for a day
+        stale = db_session.get(DownloadJob, UUID(first.json()["job_id"]))
+        stale.updated_at = datetime.utcnow() - timedelta(days=1)
+        db_session.commit()
+
+        second = client.post("/api/v1/download", json=download_request)
+
+        assert second.status_code == 200
+        assert second.json()["job_id"] != first.json()["job_id"]
+        assert stale.status == JobStatus.FAILED
+
+    def test_abandoned_job_is_not_revived_by_worker(self, db_session: Session):
+        """Test that a stale pending job abandoned by a POST is skipped when its task runs."""
+        from contextlib import contextmanager
+        from datetime import datetime, timedelta
+        from uuid import uuid4
+        from spheraform_api.routers.download import _abandon_stale_jobs
+        from spheraform_api.tasks import download as download_tasks
+
+        stale = DownloadJob(
+            dataset_id=uuid4(),
+            status=JobStatus.PENDING,
+            strategy="simple",
+            request_hash="0" * 64,
+            updated_at=datetime.utcnow() - timedelta(days=1),
+        )
+        db_session.add(stale)
+        db_session.commit()
+
+        assert _abandon_stale_jobs(db_session, stale.request_hash) == 1
+        db_session.commit()
+
+        @contextmanager
+        def test_session():
+            yield db_session
+
+        # The lost task finally gets a worker
+        with patch.object(download_tasks, "get_db_session", test_session), patch.object(
+            download_tasks.download_simple, "delay"
+        ) as dispatched:
+            result = download_tasks.process_download_job(str(stale.id))
+
+        assert result is None
+        dispatched.assert_not_called()
+        db_session.refresh(stale)
+        assert stale.status == JobStatus.FAILED
+
     def test_download_multiple_datasets(
         self, client: TestClient, db_session: Session, sample_geoserver
     ):
@@ -283,7 +394,7 @@ class TestDownloadJobResult:
     def test_download_job_result_completed(
         self, client: TestClient, db_session: Session, sample_dataset: Dataset, tmp_path
     ):
-        """Test downloading result of completed job."""
+        """Test that a result on local disk is served directly."""
         # Create a test file
         output_file = tmp_path / "result.geojson"
         output_file.write_text('{"type":"FeatureCollection","features":[]}')
@@ -291,16 +402,49 @@ class TestDownloadJobResult:
         job = DownloadJob(
             dataset_id=sample_dataset.id,
             status=JobStatus.COMPLETED,
-            format="geojson",
+            strategy="simple",
             output_path=str(output_file),
+            params={"format": "geojson"},
         )
         db_session.add(job)
         db_session.commit()
 
-        response = client.get(f"/download/jobs/{job.id}/download")
+        response = client.get(
+            f"/api/v1/download/jobs/{job.id}/download", follow_redirects=False
+        )
 
         assert response.status_code == 200
         assert response.headers["content-type"] == "application/geo+json"
+        assert response.json() == {"type": "FeatureCollection", "features": []}
+
+    def test_download_job_result_redirects_to_object_storage(
+        self, client: TestClient, db_session: Session, sample_dataset: Dataset
+    ):
+        """Test that results in object storage redirect to a presigned URL."""
+        job = DownloadJob(
+            dataset_id=sample_dataset.id,
+            status=JobStatus.COMPLETED,
+            strategy="simple",
+            output_path="s3://geodata/exports/result.geojson",
+        )
+        db_session.add(job)
+        db_session.commit()
+
+        presigned = "https://minio.test/geodata/exports/result.geojson?X-Amz-Signature=abc"
+        with patch(
+            "spheraform_core.storage.s3_client.S3Client.get_presigned_url",
+            new_callable=AsyncMock,
+            return_value=presigned,
+        ) as mock_presign:
+            response = client.get(
+                f"/api/v1/download/jobs/{job.id}/download", follow_redirects=False
+            )
+
+        assert response.status_code == 307
+        assert response.headers["location"] == presigned
+        mock_presign.assert_awaited_once_with(
+            "exports/result.geojson", bucket="geodata", expiration=3600
+        )
 
     def test_download_job_result_not_completed(
         self, client: TestClient, db_session: Session, sample_dataset: Dataset
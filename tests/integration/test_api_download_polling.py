@@ -3,11 +3,27 @@
 import pytest
 from datetime import datetime
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from spheraform_core.models import Dataset, DownloadJob, JobStatus, DownloadStrategy
 
 
+def assert_job_state(
+    session: Session,
+    job_id,
+    status: JobStatus,
+    completed_at_set: bool = True,
+) -> None:
+    """Assert a job's persisted status/completion via a two-column projection (no refresh)."""
+    job_status, completed_at = session.execute(
+        select(DownloadJob.status, DownloadJob.completed_at).where(DownloadJob.id == job_id)
+    ).one()
+
+    assert job_status == status
+    assert (completed_at is not None) == completed_at_set
+
+
 @pytest.mark.integration
 class TestDownloadJobPolling:
     """Tests for download job polling endpoints."""
@@ -158,8 +174,9 @@ class TestDownloadJobCancellation:
         )
         db_session.add(job)
         db_session.commit()
+        job_id = job.id
 
-        response = client.post(f"/api/v1/download/jobs/{job.id}/cancel")
+        response = client.post(f"/api/v1/download/jobs/{job_id}/cancel")
 
         assert response.status_code == 200
         data = response.json()
@@ -167,9 +184,7 @@ class TestDownloadJobCancellation:
         assert data["current_stage"] == "cancelled"
 
         # Verify job was actually cancelled in database
-        db_session.refresh(job)
-        assert job.status == JobStatus.CANCELLED
-        assert job.completed_at is not None
+        assert_job_state(db_session, job_id, JobStatus.CANCELLED)
 
     def test_cancel_pending_download_job(
         self, client: TestClient, db_session: Session, sample_dataset: Dataset
@@ -184,16 +199,16 @@ class TestDownloadJobCancellation:
         )
         db_session.add(job)
         db_session.commit()
+        job_id = job.id
 
-        response = client.post(f"/api/v1/download/jobs/{job.id}/cancel")
+        response = client.post(f"/api/v1/download/jobs/{job_id}/cancel")
 
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "cancelled"
 
         # Verify job was cancelled
-        db_session.refresh(job)
-        assert job.status == JobStatus.CANCELLED
+        assert_job_state(db_session, job_id, JobStatus.CANCELLED)
 
     def test_cancel_completed_job_fails(
         self, client: TestClient, db_session: Session, sample_dataset: Dataset
@@ -1,10 +1,12 @@
 """Integration tests for search API."""
 
 import pytest
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from geoalchemy2 import WKTElement
 
+from spheraform_api import facet_cache
 from spheraform_core.models import Dataset, DownloadStrategy
 
 
@@ -12,19 +14,21 @@ from spheraform_core.models import Dataset, DownloadStrategy
 class TestSearchAPI:
     """Tests for /search endpoint."""
 
-    def test_search_empty_database(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_search_empty_database(self, async_client: AsyncClient):
         """Test searching when no datasets exist."""
         search_request = {"query": "water"}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 0
         assert len(data["results"]) == 0
 
-    def test_search_by_text_in_name(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_text_in_name(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test text search in dataset names."""
         # Create datasets with different names
@@ -45,15 +49,16 @@ class TestSearchAPI:
 
         search_request = {"query": "water"}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
         assert data["results"][0]["name"] == "Water Resources"
 
-    def test_search_by_text_case_insensitive(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_text_case_insensitive(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test that text search is case-insensitive."""
         dataset = Dataset(
@@ -67,14 +72,15 @@ class TestSearchAPI:
 
         search_request = {"query": "water"}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
 
-    def test_search_by_text_in_description(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_text_in_description(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test text search in descriptions."""
         dataset = Dataset(
@@ -89,14 +95,15 @@ class TestSearchAPI:
 
         search_request = {"query": "water quality"}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
 
-    def test_search_by_text_in_keywords(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_text_in_keywords(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test text search in keywords."""
         dataset = Dataset(
@@ -111,14 +118,47 @@ class TestSearchAPI:
 
         search_request = {"query": "hydrology"}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
 
-    def test_search_by_themes(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_text_search_matches_keyword_substring(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
+    ):
+        """Test that a text search matches part of a keyword (the ILIKE fallback off PostgreSQL)."""
+        db_session.add_all(
+            [
+                Dataset(
+                    geoserver_id=sample_geoserver.id,
+                    external_id="0",
+                    name="Streams",
+                    keywords=["hydrology", "rivers"],
+                    access_url="https://test.com/0",
+                ),
+                Dataset(
+                    geoserver_id=sample_geoserver.id,
+                    external_id="1",
+                    name="Roads",
+                    keywords=["transport"],
+                    access_url="https://test.com/1",
+                ),
+            ]
+        )
+        db_session.commit()
+
+        response = await async_client.post("/api/v1/search", json={"text": "river"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["datasets"][0]["name"] == "Streams"
+
+    @pytest.mark.asyncio
+    async def test_search_by_themes(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test filtering by themes."""
         dataset1 = Dataset(
@@ -140,44 +180,42 @@ class TestSearchAPI:
 
         search_request = {"themes": ["hydro"]}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
         assert data["results"][0]["name"] == "Hydrology Data"
 
-    def test_search_by_multiple_themes(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_multiple_themes(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test filtering by multiple themes (OR logic)."""
-        dataset1 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="0",
-            name="Hydrology Data",
-            themes=["hydro"],
-            access_url="https://test.com/0",
-        )
-        dataset2 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="1",
-            name="Road Network",
-            themes=["transport"],
-            access_url="https://test.com/1",
-        )
-        dataset3 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="2",
-            name="Administrative Boundaries",
-            themes=["admin"],
-            access_url="https://test.com/2",
+        db_session.bulk_insert_mappings(
+            Dataset,
+            [
+                {
+                    "geoserver_id": sample_geoserver.id,
+                    "external_id": str(i),
+                    "name": name,
+                    "themes": [theme],
+                    "access_url": f"https://test.com/{i}",
+                }
+                for i, (name, theme) in enumerate(
+                    [
+                        ("Hydrology Data", "hydro"),
+                        ("Road Network", "transport"),
+                        ("Administrative Boundaries", "admin"),
+                    ]
+                )
+            ],
         )
-        db_session.add_all([dataset1, dataset2, dataset3])
         db_session.commit()
 
         search_request = {"themes": ["hydro", "transport"]}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
@@ -186,8 +224,9 @@ class TestSearchAPI:
         assert "Hydrology Data" in names
         assert "Road Network" in names
 
-    def test_search_by_bbox(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_bbox(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test spatial search by bounding box."""
         # Dataset in San Francisco area
@@ -214,15 +253,52 @@ class TestSearchAPI:
             "bbox": [-122.6, 37.6, -122.2, 38.0]
         }
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
         assert data["results"][0]["name"] == "SF Data"
 
-    def test_search_by_geometry(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_by_point_buffer(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
+    ):
+        """Test that a point search buffers in kilometres and excludes distant datasets."""
+        db_session.add_all(
+            [
+                Dataset(
+                    geoserver_id=sample_geoserver.id,
+                    external_id="0",
+                    name="SF Data",
+                    bbox=WKTElement("POLYGON((-122.5 37.7, -122.5 37.9, -122.3 37.9, -122.3 37.7, -122.5 37.7))", srid=4326),
+                    access_url="https://test.com/0",
+                ),
+                # Roughly 4000 km away
+                Dataset(
+                    geoserver_id=sample_geoserver.id,
+                    external_id="1",
+                    name="NYC Data",
+                    bbox=WKTElement("POLYGON((-74.1 40.6, -74.1 40.8, -73.9 40.8, -73.9 40.6, -74.1 40.6))", srid=4326),
+                    access_url="https://test.com/1",
+                ),
+            ]
+        )
+        db_session.commit()
+
+        # 10 km around a point just outside the SF bbox
+        search_request = {"point": [-122.55, 37.8], "buffer_km": 10}
+
+        response = await async_client.post("/api/v1/search", json=search_request)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["datasets"][0]["name"] == "SF Data"
+
+    @pytest.mark.asyncio
+    async def test_search_by_geometry(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test spatial search by GeoJSON geometry."""
         dataset = Dataset(
@@ -243,41 +319,39 @@ class TestSearchAPI:
             }
         }
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
 
-    def test_search_combined_filters(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_combined_filters(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test combining multiple search filters."""
-        dataset1 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="0",
-            name="Water Resources SF",
-            themes=["hydro"],
-            bbox=WKTElement("POLYGON((-122.5 37.7, -122.5 37.9, -122.3 37.9, -122.3 37.7, -122.5 37.7))", srid=4326),
-            access_url="https://test.com/0",
+        sf_bbox = WKTElement("POLYGON((-122.5 37.7, -122.5 37.9, -122.3 37.9, -122.3 37.7, -122.5 37.7))", srid=4326)
+        nyc_bbox = WKTElement("POLYGON((-74.1 40.6, -74.1 40.8, -73.9 40.8, -73.9 40.6, -74.1 40.6))", srid=4326)
+        db_session.bulk_insert_mappings(
+            Dataset,
+            [
+                {
+                    "geoserver_id": sample_geoserver.id,
+                    "external_id": str(i),
+                    "name": name,
+                    "themes": [theme],
+                    "bbox": bbox,
+                    "access_url": f"https://test.com/{i}",
+                }
+                for i, (name, theme, bbox) in enumerate(
+                    [
+                        ("Water Resources SF", "hydro", sf_bbox),
+                        ("Water Resources NYC", "hydro", nyc_bbox),
+                        ("Roads SF", "transport", sf_bbox),
+                    ]
+                )
+            ],
         )
-        dataset2 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="1",
-            name="Water Resources NYC",
-            themes=["hydro"],
-            bbox=WKTElement("POLYGON((-74.1 40.6, -74.1 40.8, -73.9 40.8, -73.9 40.6, -74.1 40.6))", srid=4326),
-            access_url="https://test.com/1",
-        )
-        dataset3 = Dataset(
-            geoserver_id=sample_geoserver.id,
-            external_id="2",
-            name="Roads SF",
-            themes=["transport"],
-            bbox=WKTElement("POLYGON((-122.5 37.7, -122.5 37.9, -122.3 37.9, -122.3 37.7, -122.5 37.7))", srid=4326),
-            access_url="https://test.com/2",
-        )
-        db_session.add_all([dataset1, dataset2, dataset3])
         db_session.commit()
 
         # Search for hydro datasets in SF area
@@ -287,31 +361,36 @@ class TestSearchAPI:
             "bbox": [-122.6, 37.6, -122.2, 38.0]
         }
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 1
         assert data["results"][0]["name"] == "Water Resources SF"
 
-    def test_search_pagination(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_pagination(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test search result pagination."""
-        # Create 25 datasets
-        for i in range(25):
-            dataset = Dataset(
-                geoserver_id=sample_geoserver.id,
-                external_id=str(i),
-                name=f"Dataset {i}",
-                access_url=f"https://test.com/{i}",
-            )
-            db_session.add(dataset)
+        # Create 25 datasets (bulk insert skips per-object unit-of-work bookkeeping)
+        db_session.bulk_insert_mappings(
+            Dataset,
+            [
+                {
+                    "geoserver_id": sample_geoserver.id,
+                    "external_id": str(i),
+                    "name": f"Dataset {i}",
+                    "access_url": f"https://test.com/{i}",
+                }
+                for i in range(25)
+            ],
+        )
         db_session.commit()
 
         # Get first page
         search_request = {"limit": 10, "offset": 0}
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
@@ -320,15 +399,16 @@ class TestSearchAPI:
 
         # Get second page
         search_request = {"limit": 10, "offset": 10}
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
         assert data["total"] == 25
         assert len(data["results"]) == 10
 
-    def test_search_facets(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_facets(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test search result facets."""
         # Create datasets with different themes
@@ -358,7 +438,7 @@ class TestSearchAPI:
 
         search_request = {}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
@@ -371,8 +451,43 @@ class TestSearchAPI:
         assert theme_facets.get("environment") == 1
         assert theme_facets.get("transport") == 1
 
-    def test_search_only_active_datasets(
-        self, client: TestClient, db_session: Session, sample_geoserver
+    @pytest.mark.asyncio
+    async def test_search_facets_cached(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
+    ):
+        """Test that identical searches run the facet aggregation only once."""
+        dataset = Dataset(
+            geoserver_id=sample_geoserver.id,
+            external_id="0",
+            name="Dataset 1",
+            themes=["hydro"],
+            access_url="https://test.com/0",
+        )
+        db_session.add(dataset)
+        db_session.commit()
+
+        facet_queries = []
+
+        def count_facet_queries(conn, cursor, statement, parameters, context, executemany):
+            if "unnest" in statement.lower() or "dataset_theme_facets" in statement:
+                facet_queries.append(statement)
+
+        engine = db_session.get_bind().engine
+        event.listen(engine, "before_cursor_execute", count_facet_queries)
+        try:
+            first = await async_client.post("/api/v1/search", json={})
+            second = await async_client.post("/api/v1/search", json={})
+        finally:
+            event.remove(engine, "before_cursor_execute", count_facet_queries)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json()["facets"] == second.json()["facets"]
+        assert len(facet_queries) == 1
+
+    @pytest.mark.asyncio
+    async def test_search_only_active_datasets(
+        self, async_client: AsyncClient, db_session: Session, sample_geoserver
     ):
         """Test that search only returns active datasets by default."""
         active = Dataset(
@@ -394,7 +509,7 @@ class TestSearchAPI:
 
         search_request = {}
 
-        response = client.post("/search/", json=search_request)
+        response = await async_client.post("/search/", json=search_request)
 
         assert response.status_code == 200
         data = response.json()
@@ -1,10 +1,11 @@
 """Integration tests for server management API."""
 
 import pytest
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
 from sqlalchemy.orm import Session
 from unittest.mock import AsyncMock, patch
 
+from spheraform_core.config import settings
 from spheraform_core.models import Geoserver, ProviderType, HealthStatus
 
 
@@ -12,7 +13,8 @@ from spheraform_core.models import Geoserver, ProviderType, HealthStatus
 class TestServersAPI:
     """Tests for /servers endpoints."""
 
-    def test_create_server(self, client: TestClient, db_session: Session):
+    @pytest.mark.asyncio
+    async def test_create_server(self, async_client: AsyncClient, db_session: Session):
         """Test creating a new server."""
         server_data = {
             "name": "Test ArcGIS Server",
@@ -21,7 +23,7 @@ class TestServersAPI:
             "probe_frequency_hours": 24,
         }
 
-        response = client.post("/servers/", json=server_data)
+        response = await async_client.post("/servers/", json=server_data)
 
         assert response.status_code == 201
         data = response.json()
@@ -35,7 +37,8 @@ class TestServersAPI:
         assert server is not None
         assert server.base_url == "https://services.arcgis.com/test"
 
-    def test_create_server_with_auth(self, client: TestClient, db_session: Session):
+    @pytest.mark.asyncio
+    async def test_create_server_with_auth(self, async_client: AsyncClient, db_session: Session):
         """Test creating a server with authentication."""
         server_data = {
             "name": "Secured Server",
@@ -47,14 +50,15 @@ class TestServersAPI:
             },
         }
 
-        response = client.post("/servers/", json=server_data)
+        response = await async_client.post("/servers/", json=server_data)
 
         assert response.status_code == 201
         data = response.json()
         assert data["name"] == "Secured Server"
         assert "auth_config" in data
 
-    def test_create_server_invalid_provider(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_create_server_invalid_provider(self, async_client: AsyncClient):
         """Test creating server with invalid provider type."""
         server_data = {
             "name": "Invalid Server",
@@ -62,31 +66,47 @@ class TestServersAPI:
             "provider_type": "invalid_provider",
         }
 
-        response = client.post("/servers/", json=server_data)
+        response = await async_client.post("/servers/", json=server_data)
 
         assert response.status_code == 422  # Validation error
 
-    def test_list_servers_empty(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_list_servers_empty(self, async_client: AsyncClient):
         """Test listing servers when none exist."""
-        response = client.get("/servers/")
+        response = await async_client.get("/servers/")
 
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
         assert len(data) == 0
 
-    def test_list_servers(self, client: TestClient, sample_geoserver: Geoserver):
+    @pytest.mark.asyncio
+    async def test_list_servers(self, async_client: AsyncClient, sample_geoserver: Geoserver):
         """Test listing servers."""
-        response = client.get("/servers/")
+        response = await async_client.get("/servers/")
 
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["name"] == sample_geoserver.name
         assert data[0]["provider_type"] == "arcgis"
+        assert "etag" in response.headers
 
-    def test_list_servers_filter_by_provider(
-        self, client: TestClient, db_session: Session
+    @pytest.mark.asyncio
+    async def test_list_servers_not_modified(self, async_client: AsyncClient, sample_geoserver: Geoserver):
+        """Test that revalidating with a matching ETag returns 304."""
+        first = await async_client.get("/api/v1/servers")
+        etag = first.headers["etag"]
+
+        response = await async_client.get("/api/v1/servers", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_list_servers_filter_by_provider(
+        self, async_client: AsyncClient, db_session: Session
     ):
         """Test filtering servers by provider type."""
         # Create servers with different provider types
@@ -103,59 +123,64 @@ class TestServersAPI:
         db_session.add_all([arcgis_server, wfs_server])
         db_session.commit()
 
-        response = client.get("/servers/?provider_type=arcgis")
+        response = await async_client.get("/servers/?provider_type=arcgis")
 
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 1
         assert data[0]["provider_type"] == "arcgis"
 
-    def test_get_server(self, client: TestClient, sample_geoserver: Geoserver):
+    @pytest.mark.asyncio
+    async def test_get_server(self, async_client: AsyncClient, sample_geoserver: Geoserver):
         """Test getting a specific server."""
-        response = client.get(f"/servers/{sample_geoserver.id}")
+        response = await async_client.get(f"/servers/{sample_geoserver.id}")
 
         assert response.status_code == 200
         data = response.json()
         assert data["id"] == str(sample_geoserver.id)
         assert data["name"] == sample_geoserver.name
 
-    def test_get_server_not_found(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_get_server_not_found(self, async_client: AsyncClient):
         """Test getting a non-existent server."""
         fake_id = "00000000-0000-0000-0000-000000000000"
-        response = client.get(f"/servers/{fake_id}")
+        response = await async_client.get(f"/servers/{fake_id}")
 
         assert response.status_code == 404
 
-    def test_update_server(self, client: TestClient, sample_geoserver: Geoserver):
+    @pytest.mark.asyncio
+    async def test_update_server(self, async_client: AsyncClient, sample_geoserver: Geoserver):
         """Test updating a server."""
         update_data = {
             "name": "Updated Server Name",
             "probe_frequency_hours": 48,
         }
 
-        response = client.put(f"/servers/{sample_geoserver.id}", json=update_data)
+        response = await async_client.put(f"/servers/{sample_geoserver.id}", json=update_data)
 
         assert response.status_code == 200
         data = response.json()
         assert data["name"] == "Updated Server Name"
         assert data["probe_frequency_hours"] == 48
 
-    def test_update_server_not_found(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_update_server_not_found(self, async_client: AsyncClient):
         """Test updating a non-existent server."""
         fake_id = "00000000-0000-0000-0000-000000000000"
         update_data = {"name": "Updated"}
 
-        response = client.put(f"/servers/{fake_id}", json=update_data)
+        response = await async_client.put(f"/servers/{fake_id}", json=update_data)
 
         assert response.status_code == 404
 
-    def test_delete_server(
-        self, client: TestClient, sample_geoserver: Geoserver, db_session: Session
+    @pytest.mark.asyncio
+    async def test_delete_server(
+        self, async_client: AsyncClient, sample_geoserver: Geoserver, db_session: Session
     ):
         """Test deleting a server."""
         server_id = sample_geoserver.id
 
-        response = client.delete(f"/servers/{server_id}")
+        response = await async_client.delete(f"/servers/{server_id}")
 
         assert response.status_code == 204
 
@@ -163,11 +188,25 @@ class TestServersAPI:
         server = db_session.query(Geoserver).filter_by(id=server_id).first()
         assert server is None
 
-    def test_delete_server_not_found(self, client: TestClient):
+    @pytest.mark.asyncio
+    async def test_delete_server_queues_facet_refresh(
+        self, async_client: AsyncClient, sample_geoserver: Geoserver, monkeypatch
+    ):
+        """Test that deleting a server refreshes the facet view in a Celery task."""
+        monkeypatch.setattr(settings, "use_celery", True)
+
+        with patch("spheraform_api.routers.servers.refresh_facets") as refresh_facets:
+            response = await async_client.delete(f"/api/v1/servers/{sample_geoserver.id}")
+
+        assert response.status_code == 204
+        refresh_facets.delay.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_delete_server_not_found(self, async_client: AsyncClient):
         """Test deleting a non-existent server."""
         fake_id = "00000000-0000-0000-0000-000000000000"
 
-        response = client.delete(f"/servers/{fake_id}")
+        response = await async_client.delete(f"/servers/{fake_id}")
 
         assert response.status_code == 404
 
@@ -178,7 +217,7 @@ class TestServerHealthCheck:
 
     @pytest.mark.asyncio
     async def test_health_check_success(
-        self, client: TestClient, sample_geoserver: Geoserver
+        self, async_client: AsyncClient, sample_geoserver: Geoserver
     ):
         """Test health check that succeeds."""
         with patch(
@@ -190,7 +229,7 @@ class TestServerHealthCheck:
             mock_adapter.__aexit__.return_value = None
             mock_adapter_class.return_value = mock_adapter
 
-            response = client.get(f"/servers/{sample_geoserver.id}/health")
+            response = await async_client.get(f"/servers/{sample_geoserver.id}/health")
 
             assert response.status_code == 200
             data = response.json()
@@ -198,7 +237,7 @@ class TestServerHealthCheck:
 
     @pytest.mark.asyncio
     async def test_health_check_failure(
-        self, client: TestClient, sample_geoserver: Geoserver
+        self, async_client: AsyncClient, sample_geoserver: Geoserver
     ):
         """Test health check that fails."""
         with patch(
@@ -210,7 +249,7 @@ class TestServerHealthCheck:
             mock_adapter.__aexit__.return_value = None
             mock_adapter_class.return_value = mock_adapter
 
-            response = client.get(f"/servers/{sample_geoserver.id}/health")
+            response = await async_client.get(f"/servers/{sample_geoserver.id}/health")
 
             assert response.status_code == 200
             data = response.json()
@@ -223,7 +262,7 @@ class TestServerCrawl:
 
     @pytest.mark.asyncio
     async def test_crawl_server(
-        self, client: TestClient, sample_geoserver: Geoserver, db_session: Session
+        self, async_client: AsyncClient, sample_geoserver: Geoserver, db_session: Session
     ):
         """Test crawling a server to discover datasets."""
         from spheraform_core.adapters.base import DatasetMetadata
@@ -263,7 +302,7 @@ class TestServerCrawl:
             mock_adapter.__aexit__.return_value = None
             mock_adapter_class.return_value = mock_adapter
 
-            response = client.post(f"/servers/{sample_geoserver.id}/crawl")
+            response = await async_client.post(f"/servers/{sample_geoserver.id}/crawl")
 
             assert response.status_code == 200
             data = response.json()
@@ -282,17 +321,17 @@ class TestServerCrawl:
             assert len(datasets) == 2
 
     @pytest.mark.asyncio
-    async def test_crawl_server_not_found(self, client: TestClient):
+    async def test_crawl_server_not_found(self, async_client: AsyncClient):
         """Test crawling a non-existent server."""
         fake_id = "00000000-0000-0000-0000-000000000000"
 
-        response = client.post(f"/servers/{fake_id}/crawl")
+        response = await async_client.post(f"/servers/{fake_id}/crawl")
 
         assert response.status_code == 404
 
     @pytest.mark.asyncio
     async def test_crawl_server_updates_existing_datasets(
-        self, client: TestClient, sample_dataset, db_session: Session
+        self, async_client: AsyncClient, sample_dataset, db_session: Session
     ):
         """Test that crawling updates existing datasets."""
         from spheraform_core.adapters.base import DatasetMetadata
@@ -319,7 +358,7 @@ class TestServerCrawl:
             mock_adapter.__aexit__.return_value = None
             mock_adapter_class.return_value = mock_adapter
 
-            response = client.post(f"/servers/{sample_dataset.geoserver_id}/crawl")
+            response = await async_client.post(f"/servers/{sample_dataset.geoserver_id}/crawl")
 
             assert response.status_code == 200
             data = response.json()
@@ -0,0 +1,31 @@
+"""Fixtures shared by the unit tests."""
+
+import asyncio
+from typing import Generator
+from unittest.mock import AsyncMock
+
+import pytest
+
+from spheraform_core.adapters.arcgis import ArcGISAdapter
+
+
+@pytest.fixture(scope="module")
+def arcgis_adapter() -> Generator[ArcGISAdapter, None, None]:
+    """
+    One ArcGIS adapter shared by every test in a module.
+
+    Building the adapter builds an httpx.AsyncClient (transport, pool, SSL
+    context) which the tests never use for real: they patch ``_request`` or
+    ``client.get`` with ``patch.object``, which is undone after each test.
+    """
+    adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
+    yield adapter
+    asyncio.run(adapter.client.aclose())
+
+
+@pytest.fixture
+def mock_request(arcgis_adapter: ArcGISAdapter, monkeypatch: pytest.MonkeyPatch) -> AsyncMock:
+    """AsyncMock standing in for ``arcgis_adapter._request`` for one test."""
+    mock = AsyncMock()
+    monkeypatch.setattr(arcgis_adapter, "_request", mock)
+    return mock
@@ -2,7 +2,7 @@
 
 import pytest
 from datetime import datetime
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock, mock_open
 import httpx
 
 from spheraform_core.adapters.arcgis import ArcGISAdapter
@@ -18,12 +18,11 @@ from spheraform_core.adapters.base import (
 class TestArcGISAdapterInit:
     """Tests for ArcGIS adapter initialization."""
 
-    def test_adapter_creation(self):
+    def test_adapter_creation(self, arcgis_adapter):
         """Test creating an adapter instance."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-        assert adapter.base_url == "https://services.arcgis.com/test"
-        assert adapter.provider_type == "arcgis"
-        assert adapter.client is not None
+        assert arcgis_adapter.base_url == "https://services.arcgis.com/test"
+        assert arcgis_adapter.provider_type == "arcgis"
+        assert arcgis_adapter.client is not None
 
     @pytest.mark.asyncio
     async def test_adapter_context_manager(self):
@@ -40,40 +39,34 @@ class TestArcGISProbeCapabilities:
 
     @pytest.mark.asyncio
     async def test_probe_capabilities_with_services(
-        self, mock_arcgis_server_info, mock_arcgis_service_info
+        self, arcgis_adapter, mock_request, mock_arcgis_server_info, mock_arcgis_service_info
     ):
         """Test probing capabilities from a server with services."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
+        # First call returns server info, second returns service info
+        mock_request.side_effect = [
+            mock_arcgis_server_info,
+            mock_arcgis_service_info,
+        ]
 
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            # First call returns server info, second returns service info
-            mock_request.side_effect = [
-                mock_arcgis_server_info,
-                mock_arcgis_service_info,
-            ]
-
-            capabilities = await adapter.probe_capabilities()
+        capabilities = await arcgis_adapter.probe_capabilities()
 
-            assert isinstance(capabilities, ServerCapabilities)
-            assert capabilities.max_features_per_request == 2000
-            assert capabilities.supports_pagination is True
-            assert capabilities.supports_result_offset is True
-            assert capabilities.supports_oid_query is True
-            assert "geojson" in capabilities.output_formats
+        assert isinstance(capabilities, ServerCapabilities)
+        assert capabilities.max_features_per_request == 2000
+        assert capabilities.supports_pagination is True
+        assert capabilities.supports_result_offset is True
+        assert capabilities.supports_oid_query is True
+        assert "geojson" in capabilities.output_formats
 
     @pytest.mark.asyncio
-    async def test_probe_capabilities_defaults_on_error(self):
+    async def test_probe_capabilities_defaults_on_error(self, arcgis_adapter, mock_request):
         """Test that default capabilities are returned on error."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = Exception("Network error")
+        mock_request.side_effect = Exception("Network error")
 
-            capabilities = await adapter.probe_capabilities()
+        capabilities = await arcgis_adapter.probe_capabilities()
 
-            assert isinstance(capabilities, ServerCapabilities)
-            # Should return defaults
-            assert capabilities.max_features_per_request > 0
+        assert isinstance(capabilities, ServerCapabilities)
+        # Should return defaults
+        assert capabilities.max_features_per_request > 0
 
 
 @pytest.mark.unit
@@ -82,29 +75,25 @@ class TestArcGISHealthCheck:
     """Tests for health check."""
 
     @pytest.mark.asyncio
-    async def test_health_check_success(self, mock_arcgis_server_info):
+    async def test_health_check_success(
+        self, arcgis_adapter, mock_request, mock_arcgis_server_info
+    ):
         """Test successful health check."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_server_info
+        mock_request.return_value = mock_arcgis_server_info
 
-            result = await adapter.health_check()
+        result = await arcgis_adapter.health_check()
 
-            assert result is True
-            mock_request.assert_called_once()
+        assert result is True
+        mock_request.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_health_check_failure(self):
+    async def test_health_check_failure(self, arcgis_adapter, mock_request):
         """Test failed health check."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = Exception("Connection failed")
+        mock_request.side_effect = Exception("Connection failed")
 
-            result = await adapter.health_check()
+        result = await arcgis_adapter.health_check()
 
-            assert result is False
+        assert result is False
 
 
 @pytest.mark.unit
@@ -114,37 +103,32 @@ class TestArcGISDiscoverDatasets:
 
     @pytest.mark.asyncio
     async def test_discover_datasets(
-        self,
+        self, arcgis_adapter, mock_request,
         mock_arcgis_server_info,
         mock_arcgis_service_info,
         mock_arcgis_layer_info,
     ):
         """Test discovering datasets from a server."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            # Return server info, service info, and layer info
-            mock_request.side_effect = [
-                mock_arcgis_server_info,
-                mock_arcgis_service_info,
-                mock_arcgis_layer_info,
-                mock_arcgis_layer_info,  # For second layer
-            ]
+        # Return server info, service info, and layer info
+        mock_request.side_effect = [
+            mock_arcgis_server_info,
+            mock_arcgis_service_info,
+            mock_arcgis_layer_info,
+            mock_arcgis_layer_info,  # For second layer
+        ]
 
-            datasets = []
-            async for dataset in adapter.discover_datasets():
-                datasets.append(dataset)
+        datasets = []
+        async for dataset in arcgis_adapter.discover_datasets():
+            datasets.append(dataset)
 
-            assert len(datasets) == 2  # Two layers in mock service
-            assert all(isinstance(d, DatasetMetadata) for d in datasets)
-            assert datasets[0].name == "Cities"
-            assert datasets[0].external_id == "0"
+        assert len(datasets) == 2  # Two layers in mock service
+        assert all(isinstance(d, DatasetMetadata) for d in datasets)
+        assert datasets[0].name == "Cities"
+        assert datasets[0].external_id == "0"
 
     @pytest.mark.asyncio
-    async def test_discover_datasets_with_folders(self):
+    async def test_discover_datasets_with_folders(self, arcgis_adapter, mock_request):
         """Test discovering datasets from servers with folders."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
         server_with_folders = {
             "folders": ["Folder1"],
             "services": [
@@ -171,21 +155,20 @@ class TestArcGISDiscoverDatasets:
             "extent": {"xmin": -180, "ymin": -90, "xmax": 180, "ymax": 90},
         }
 
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = [
-                server_with_folders,
-                service_info,
-                layer_info,
-                folder_catalog,
-                service_info,
-                layer_info,
-            ]
+        mock_request.side_effect = [
+            server_with_folders,
+            service_info,
+            layer_info,
+            folder_catalog,
+            service_info,
+            layer_info,
+        ]
 
-            datasets = []
-            async for dataset in adapter.discover_datasets():
-                datasets.append(dataset)
+        datasets = []
+        async for dataset in arcgis_adapter.discover_datasets():
+            datasets.append(dataset)
 
-            assert len(datasets) == 2  # One from root, one from folder
+        assert len(datasets) == 2  # One from root, one from folder
 
 
 @pytest.mark.unit
@@ -193,11 +176,9 @@ class TestArcGISDiscoverDatasets:
 class TestArcGISMetadataExtraction:
     """Tests for metadata extraction."""
 
-    def test_extract_metadata_with_extent(self, mock_arcgis_layer_info):
+    def test_extract_metadata_with_extent(self, arcgis_adapter, mock_arcgis_layer_info):
         """Test extracting metadata with spatial extent."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        metadata = adapter._extract_metadata(
+        metadata = arcgis_adapter._extract_metadata(
             mock_arcgis_layer_info,
             "https://services.arcgis.com/test/FeatureServer/0",
         )
@@ -208,22 +189,18 @@ class TestArcGISMetadataExtraction:
         assert metadata.bbox == (-180, -90, 180, 90)
         assert metadata.attribution == "Esri"
 
-    def test_parse_edit_date(self, mock_arcgis_layer_info):
+    def test_parse_edit_date(self, arcgis_adapter, mock_arcgis_layer_info):
         """Test parsing edit date from layer info."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        edit_date = adapter._parse_edit_date(mock_arcgis_layer_info)
+        edit_date = arcgis_adapter._parse_edit_date(mock_arcgis_layer_info)
 
         assert isinstance(edit_date, datetime)
         # The mock has timestamp 1638360000000 (Dec 1, 2021)
         assert edit_date.year == 2021
 
-    def test_parse_edit_date_missing(self):
+    def test_parse_edit_date_missing(self, arcgis_adapter):
         """Test parsing edit date when not available."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
         layer_info = {"id": 0, "name": "Test"}
-        edit_date = adapter._parse_edit_date(layer_info)
+        edit_date = arcgis_adapter._parse_edit_date(layer_info)
 
         assert edit_date is None
 
@@ -234,81 +211,50 @@ class TestArcGISChangeDetection:
     """Tests for change detection."""
 
     @pytest.mark.asyncio
-    async def test_check_changed_with_edit_date(self, mock_arcgis_layer_info):
-        """Test change detection using edit date."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_layer_info
-
+    @pytest.mark.parametrize(
+        "cached_date,layer_info,expected_result,expected_conclusive",
+        [
             # Cached date is older than current
-            cached_date = datetime(2021, 1, 1)
-
-            result = await adapter.check_changed(
-                dataset_id="abc-123",
-                external_id="0",
-                source_updated_at=cached_date,
-            )
-
-            assert result.changed is True
-            assert result.result == ChangeCheckResult.CHANGED
-            assert result.conclusive is True
-            assert result.method == "arcgis_edit_date"
-
-    @pytest.mark.asyncio
-    async def test_check_unchanged_with_edit_date(self, mock_arcgis_layer_info):
-        """Test detecting no change using edit date."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_layer_info
-
+            pytest.param(
+                datetime(2021, 1, 1), None, ChangeCheckResult.CHANGED, True, id="changed"
+            ),
             # Cached date is newer than current
-            cached_date = datetime(2025, 1, 1)
-
-            result = await adapter.check_changed(
-                dataset_id="abc-123",
-                external_id="0",
-                source_updated_at=cached_date,
-            )
-
-            assert result.changed is False
-            assert result.result == ChangeCheckResult.UNCHANGED
-            assert result.conclusive is True
-
-    @pytest.mark.asyncio
-    async def test_check_changed_no_cached_date(self, mock_arcgis_layer_info):
-        """Test change check with no cached date."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_layer_info
-
-            result = await adapter.check_changed(
-                dataset_id="abc-123",
-                external_id="0",
-            )
-
-            assert result.changed is True
-            assert result.result == ChangeCheckResult.CHANGED
-
-    @pytest.mark.asyncio
-    async def test_check_changed_no_edit_date(self):
-        """Test change check when layer has no edit date."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        layer_info = {"id": 0, "name": "Test"}
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = layer_info
+            pytest.param(
+                datetime(2025, 1, 1), None, ChangeCheckResult.UNCHANGED, True, id="unchanged"
+            ),
+            pytest.param(None, None, ChangeCheckResult.CHANGED, True, id="no_cached_date"),
+            pytest.param(
+                None,
+                {"id": 0, "name": "Test"},
+                ChangeCheckResult.INCONCLUSIVE,
+                False,
+                id="no_edit_date",
+            ),
+        ],
+    )
+    async def test_check_changed(
+        self,
+        arcgis_adapter,
+        mock_request,
+        mock_arcgis_layer_info,
+        cached_date,
+        layer_info,
+        expected_result,
+        expected_conclusive,
+    ):
+        """Test change detection using the layer's edit date."""
+        mock_request.return_value = layer_info or mock_arcgis_layer_info
 
-            result = await adapter.check_changed(
-                dataset_id="abc-123",
-                external_id="0",
-            )
+        result = await arcgis_adapter.check_changed(
+            dataset_id="abc-123",
+            external_id="0",
+            source_updated_at=cached_date,
+        )
 
-            assert result.result == ChangeCheckResult.INCONCLUSIVE
-            assert result.conclusive is False
+        assert result.result == expected_result
+        assert result.changed is (expected_result == ChangeCheckResult.CHANGED)
+        assert result.conclusive is expected_conclusive
+        assert result.method == "arcgis_edit_date"
 
 
 @pytest.mark.unit
@@ -317,29 +263,25 @@ class TestArcGISFeatureCount:
     """Tests for getting feature counts."""
 
     @pytest.mark.asyncio
-    async def test_get_feature_count(self, mock_arcgis_count_response):
+    async def test_get_feature_count(
+        self, arcgis_adapter, mock_request, mock_arcgis_count_response
+    ):
         """Test getting feature count."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
+        mock_request.return_value = mock_arcgis_count_response
 
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_count_response
+        count = await arcgis_adapter.get_feature_count("0")
 
-            count = await adapter.get_feature_count("0")
-
-            assert count == 1000
-            mock_request.assert_called_once()
+        assert count == 1000
+        mock_request.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_get_feature_count_error(self):
+    async def test_get_feature_count_error(self, arcgis_adapter, mock_request):
         """Test feature count when request fails."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = Exception("Request failed")
+        mock_request.side_effect = Exception("Request failed")
 
-            count = await adapter.get_feature_count("0")
+        count = await arcgis_adapter.get_feature_count("0")
 
-            assert count is None
+        assert count is None
 
 
 @pytest.mark.unit
@@ -349,33 +291,27 @@ class TestArcGISOIDRange:
 
     @pytest.mark.asyncio
     async def test_get_oid_range(
-        self, mock_arcgis_layer_info, mock_arcgis_oid_range_response
+        self, arcgis_adapter, mock_request, mock_arcgis_layer_info, mock_arcgis_oid_range_response
     ):
         """Test getting OID range."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = [
-                mock_arcgis_layer_info,
-                mock_arcgis_oid_range_response,
-            ]
+        mock_request.side_effect = [
+            mock_arcgis_layer_info,
+            mock_arcgis_oid_range_response,
+        ]
 
-            oid_range = await adapter.get_oid_range("0")
+        oid_range = await arcgis_adapter.get_oid_range("0")
 
-            assert oid_range is not None
-            assert oid_range == (1, 1000)
+        assert oid_range is not None
+        assert oid_range == (1, 1000)
 
     @pytest.mark.asyncio
-    async def test_get_oid_range_error(self):
+    async def test_get_oid_range_error(self, arcgis_adapter, mock_request):
         """Test OID range when request fails."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.side_effect = Exception("Request failed")
+        mock_request.side_effect = Exception("Request failed")
 
-            oid_range = await adapter.get_oid_range("0")
+        oid_range = await arcgis_adapter.get_oid_range("0")
 
-            assert oid_range is None
+        assert oid_range is None
 
 
 @pytest.mark.unit
@@ -384,21 +320,23 @@ class TestArcGISDownload:
     """Tests for download functionality."""
 
     @pytest.mark.asyncio
-    async def test_download_simple(self, mock_arcgis_query_response, tmp_path):
+    async def test_download_simple(self, arcgis_adapter, mock_arcgis_query_response):
         """Test simple download."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-        output_path = str(tmp_path / "output.geojson")
+        output_path = "output.geojson"
 
         mock_response = MagicMock()
         mock_response.content = b'{"type":"FeatureCollection"}'
         mock_response.raise_for_status = MagicMock()
 
+        # Only the result is checked, so keep the write off the filesystem
         with patch.object(
-            adapter.client, "get", new_callable=AsyncMock
-        ) as mock_get:
+            arcgis_adapter.client, "get", new_callable=AsyncMock
+        ) as mock_get, patch(
+            "spheraform_core.adapters.arcgis.open", mock_open(), create=True
+        ) as written, patch("os.path.getsize", return_value=len(mock_response.content)):
             mock_get.return_value = mock_response
 
-            result = await adapter.download_simple(
+            result = await arcgis_adapter.download_simple(
                 external_id="0",
                 output_path=output_path,
                 format="geojson",
@@ -407,19 +345,109 @@ class TestArcGISDownload:
             assert result.success is True
             assert result.output_path == output_path
             assert result.size_bytes > 0
+            written.assert_called_once_with(output_path, "wb")
 
     @pytest.mark.asyncio
-    async def test_download_simple_error(self, tmp_path):
-        """Test download with error."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
+    @pytest.mark.parametrize("format", ["geojson", "json"])
+    async def test_download_simple_with_geometry(
+        self, arcgis_adapter, mock_request, mock_arcgis_query_response, tmp_path, format
+    ):
+        """Test that the clip bbox goes to the server and the exact geometry is applied locally."""
         output_path = str(tmp_path / "output.geojson")
 
+        # Triangle whose bbox covers both cities but whose area only covers San Francisco
+        clip = {
+            "type": "Polygon",
+            "coordinates": [[[-123.0, 33.0], [-117.0, 38.5], [-123.0, 38.5], [-123.0, 33.0]]],
+        }
+
+        mock_request.return_value = mock_arcgis_query_response
+
+        result = await arcgis_adapter.download_simple(
+            external_id="0",
+            output_path=output_path,
+            geometry=clip,
+            format=format,
+        )
+
+        params = mock_request.call_args.kwargs["params"]
+        # Clipping needs GeoJSON geometries whatever the output format
+        assert params["f"] == "geojson"
+        assert params["geometryType"] == "esriGeometryEnvelope"
+        assert params["geometry"] == "-123.0,33.0,-117.0,38.5"
+        assert result.success is True
+        assert result.feature_count == 1
+
+    @pytest.mark.asyncio
+    async def test_download_paged_streams_feature_collection(
+        self, arcgis_adapter, mock_request, mock_arcgis_query_response, tmp_path
+    ):
+        """Test paged download writes a valid FeatureCollection."""
+        import json
+
+        output_path = tmp_path / "output.geojson"
+
+        mock_request.side_effect = [{"count": 2}, mock_arcgis_query_response]
+
+        result = await arcgis_adapter.download_paged(
+            layer_url="https://services.arcgis.com/test/FeatureServer/0",
+            output_path=str(output_path),
+        )
+
+        assert result.success is True
+        assert result.feature_count == 2
+        data = json.loads(output_path.read_bytes())
+        assert data["type"] == "FeatureCollection"
+        assert len(data["features"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_download_paged_logs_progress_by_offset(
+        self, arcgis_adapter, mock_request, tmp_path, caplog
+    ):
+        """Test progress is logged per 10k fetched features even when the clip keeps none."""
+        page = {
+            "type": "FeatureCollection",
+            "features": [
+                # Inside the triangle's bbox but outside the triangle
+                {"type": "Feature", "geometry": {"type": "Point", "coordinates": [15.0, 15.0]}}
+            ]
+            * 5000,
+        }
+        clip = {
+            "type": "Polygon",
+            "coordinates": [[[0.0, 0.0], [20.0, 0.0], [0.0, 20.0], [0.0, 0.0]]],
+        }
+
+        mock_request.side_effect = [{"count": 25000}] + [page] * 5
+
+        with caplog.at_level("INFO"):
+            result = await arcgis_adapter.download_paged(
+                layer_url="https://services.arcgis.com/test/FeatureServer/0",
+                output_path=str(tmp_path / "output.geojson"),
+                max_records=5000,
+                geometry=clip,
+            )
+
+        assert result.success is True
+        assert result.feature_count == 0
+        progress = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Fetched ")]
+        assert progress == [
+            "Fetched 10,000 / 25,000 features (40.0%), kept 0",
+            "Fetched 20,000 / 25,000 features (80.0%), kept 0",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_download_simple_error(self, arcgis_adapter):
+        """Test download with error."""
+        # The request fails before anything is written
+        output_path = "output.geojson"
+
         with patch.object(
-            adapter.client, "get", new_callable=AsyncMock
+            arcgis_adapter.client, "get", new_callable=AsyncMock
         ) as mock_get:
             mock_get.side_effect = httpx.HTTPError("Download failed")
 
-            result = await adapter.download_simple(
+            result = await arcgis_adapter.download_simple(
                 external_id="0",
                 output_path=output_path,
             )
@@ -428,29 +456,29 @@ class TestArcGISDownload:
             assert result.error is not None
 
     @pytest.mark.asyncio
-    async def test_fetch_by_oid_range(self, mock_arcgis_layer_info, tmp_path):
+    async def test_fetch_by_oid_range(
+        self, arcgis_adapter, mock_request, mock_arcgis_layer_info
+    ):
         """Test fetching by OID range."""
-        adapter = ArcGISAdapter(base_url="https://services.arcgis.com/test")
-        output_path = str(tmp_path / "chunk.geojson")
+        output_path = "chunk.geojson"
 
         mock_response = MagicMock()
         mock_response.content = b'{"type":"FeatureCollection","features":[]}'
         mock_response.raise_for_status = MagicMock()
 
-        with patch.object(adapter, "_request", new_callable=AsyncMock) as mock_request:
-            mock_request.return_value = mock_arcgis_layer_info
+        mock_request.return_value = mock_arcgis_layer_info
 
-            with patch.object(
-                adapter.client, "get", new_callable=AsyncMock
-            ) as mock_get:
-                mock_get.return_value = mock_response
+        with patch.object(
+            arcgis_adapter.client, "get", new_callable=AsyncMock
+        ) as mock_get:
+            mock_get.return_value = mock_response
 
-                result = await adapter.fetch_by_oid_range(
-                    external_id="0",
-                    min_oid=1,
-                    max_oid=100,
-                    output_path=output_path,
-                )
+            result = await arcgis_adapter.fetch_by_oid_range(
+                external_id="0",
+                min_oid=1,
+                max_oid=100,
+                output_path=output_path,
+            )
 
-                assert result.success is True
-                assert result.output_path == output_path
+            assert result.success is True
+            assert result.output_path == output_path
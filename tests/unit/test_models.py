@@ -1,7 +1,11 @@
 """Unit tests for SQLAlchemy models."""
 
 import pytest
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Generator
+from uuid import uuid4
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.orm import Session
 
 from spheraform_core.models import (
@@ -17,14 +21,57 @@ from spheraform_core.models import (
     ChangeCheckMethod,
 )
 
+# Built once so every run reuses the same cached compiled statements
+_CHECKS_BY_DATASET = select(ChangeCheck).where(ChangeCheck.dataset_id == bindparam("dataset_id"))
+_INSERT_GEOSERVERS = insert(Geoserver).returning(Geoserver, sort_by_parameter_order=True)
+_INSERT_DATASETS = insert(Dataset).returning(Dataset, sort_by_parameter_order=True)
+_INSERT_DOWNLOAD_JOBS = insert(DownloadJob).returning(DownloadJob, sort_by_parameter_order=True)
 
-@pytest.mark.unit
-class TestGeoserverModel:
-    """Tests for Geoserver model."""
+_METHODS = (
+    ChangeCheckMethod.ETAG,
+    ChangeCheckMethod.LAST_MODIFIED,
+    ChangeCheckMethod.ARCGIS_EDIT_DATE,
+)
 
-    def test_create_geoserver(self, db_session: Session):
-        """Test creating a geoserver."""
-        server = Geoserver(
+
+@contextmanager
+def _insert_for_class(session_connection, statement, rows: list[dict]) -> Generator[list, None, None]:
+    """
+    Run a bulk INSERT ... RETURNING in a SAVEPOINT for a class-scoped fixture.
+
+    Enters with the returned objects (detached, attributes loaded) and rolls
+    the SAVEPOINT back on exit, i.e. once the class has run.
+    """
+    savepoint = session_connection.begin_nested()
+    session = Session(
+        bind=session_connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+    inserted = session.scalars(statement, rows).all()
+    session.commit()
+    session.expunge_all()
+    session.close()
+    try:
+        yield inserted
+    finally:
+        if savepoint.is_active:
+            savepoint.rollback()
+
+
+@pytest.fixture(scope="class")
+def geoserver_variants(session_connection) -> Generator[dict[str, Geoserver], None, None]:
+    """
+    Geoservers covering each TestGeoserverModel case, inserted in one commit.
+
+    A single ORM bulk INSERT ... RETURNING hands back the full rows, Python-side
+    defaults (id, timestamps) included, without a separate SELECT.
+
+    They live in a SAVEPOINT on the session connection that is rolled back
+    once the class has run (see _insert_for_class).
+    """
+    rows = {
+        "full": dict(
             name="Test ArcGIS Server",
             base_url="https://services.arcgis.com/test",
             provider_type=ProviderType.ARCGIS,
@@ -32,51 +79,19 @@ class TestGeoserverModel:
             probe_frequency_hours=24,
             dataset_count=0,
             active_dataset_count=0,
-        )
-        db_session.add(server)
-        db_session.commit()
-
-        assert server.id is not None
-        assert server.name == "Test ArcGIS Server"
-        assert server.provider_type == ProviderType.ARCGIS
-        assert server.health_status == HealthStatus.HEALTHY
-        assert server.created_at is not None
-        assert server.updated_at is not None
-
-    def test_geoserver_timestamps(self, db_session: Session):
-        """Test that timestamps are automatically set."""
-        server = Geoserver(
+        ),
+        "minimal": dict(
             name="Test Server",
             base_url="https://test.com",
             provider_type=ProviderType.ARCGIS,
-        )
-        db_session.add(server)
-        db_session.commit()
-        db_session.refresh(server)
-
-        assert server.created_at is not None
-        assert server.updated_at is not None
-        assert isinstance(server.created_at, datetime)
-        assert isinstance(server.updated_at, datetime)
-
-    def test_geoserver_auth_config(self, db_session: Session):
-        """Test storing auth configuration as JSON."""
-        server = Geoserver(
+        ),
+        "auth_config": dict(
             name="Test Server",
             base_url="https://test.com",
             provider_type=ProviderType.ARCGIS,
             auth_config={"type": "api_key", "key": "secret123"},
-        )
-        db_session.add(server)
-        db_session.commit()
-        db_session.refresh(server)
-
-        assert server.auth_config == {"type": "api_key", "key": "secret123"}
-        assert server.auth_config["type"] == "api_key"
-
-    def test_geoserver_capabilities(self, db_session: Session):
-        """Test storing server capabilities."""
-        server = Geoserver(
+        ),
+        "capabilities": dict(
             name="Test Server",
             base_url="https://test.com",
             provider_type=ProviderType.ARCGIS,
@@ -84,13 +99,85 @@ class TestGeoserverModel:
                 "max_features_per_request": 2000,
                 "supports_pagination": True,
             },
+        ),
+    }
+    with _insert_for_class(session_connection, _INSERT_GEOSERVERS, list(rows.values())) as inserted:
+        yield dict(zip(rows, inserted))
+
+
+@pytest.fixture(scope="class")
+def job_dataset(session_connection) -> Generator[Dataset, None, None]:
+    """Class-scoped copy of the sample geoserver and dataset for the job tests."""
+    server_row = dict(
+        name="Test ArcGIS Server",
+        base_url="https://services.arcgis.com/test",
+        provider_type=ProviderType.ARCGIS,
+    )
+    with _insert_for_class(session_connection, _INSERT_GEOSERVERS, [server_row]) as (server,):
+        dataset_row = dict(
+            geoserver_id=server.id,
+            external_id="0",
+            name="Test Dataset",
+            access_url="https://services.arcgis.com/test/FeatureServer/0",
+            download_strategy=DownloadStrategy.SIMPLE,
+            bbox=None,
         )
-        db_session.add(server)
-        db_session.commit()
-        db_session.refresh(server)
+        with _insert_for_class(session_connection, _INSERT_DATASETS, [dataset_row]) as (dataset,):
+            yield dataset
+
+
+@pytest.fixture(scope="class")
+def sample_jobs(session_connection, job_dataset: Dataset) -> Generator[list[DownloadJob], None, None]:
+    """Three pending jobs for job_dataset, inserted in one statement."""
+    rows = [
+        {
+            "dataset_id": job_dataset.id,
+            "status": JobStatus.PENDING,
+            "strategy": "simple",
+            "output_format": "geojson",
+            "total_chunks": total_chunks,
+            "chunks_completed": 0,
+        }
+        for total_chunks in (1, 10, 5)
+    ]
+    with _insert_for_class(session_connection, _INSERT_DOWNLOAD_JOBS, rows) as jobs:
+        yield jobs
+
 
-        assert server.capabilities["max_features_per_request"] == 2000
-        assert server.capabilities["supports_pagination"] is True
+@pytest.mark.unit
+class TestGeoserverModel:
+    """Tests for Geoserver model."""
+
+    @pytest.mark.parametrize(
+        "variant,expected",
+        [
+            (
+                "full",
+                {
+                    "name": "Test ArcGIS Server",
+                    "provider_type": ProviderType.ARCGIS,
+                    "health_status": HealthStatus.HEALTHY,
+                },
+            ),
+            ("minimal", {"name": "Test Server", "provider_type": ProviderType.ARCGIS}),
+            ("auth_config", {"auth_config": {"type": "api_key", "key": "secret123"}}),
+            (
+                "capabilities",
+                {"capabilities": {"max_features_per_request": 2000, "supports_pagination": True}},
+            ),
+        ],
+    )
+    def test_geoserver_variants(
+        self, geoserver_variants: dict[str, Geoserver], variant: str, expected: dict
+    ):
+        """Test that each geoserver variant is stored with ids, timestamps and its fields."""
+        server = geoserver_variants[variant]
+
+        assert server.id is not None
+        assert isinstance(server.created_at, datetime)
+        assert isinstance(server.updated_at, datetime)
+        for attr, value in expected.items():
+            assert getattr(server, attr) == value, attr
 
 
 @pytest.mark.unit
@@ -112,19 +199,18 @@ class TestDatasetModel:
             is_active=True,
         )
         db_session.add(dataset)
-        db_session.commit()
+        db_session.flush()
 
         assert dataset.id is not None
         assert dataset.geoserver_id == sample_geoserver.id
         assert dataset.name == "Test Dataset"
-        assert "test" in dataset.keywords
-        assert "hydro" in dataset.themes
+        assert "test" in set(dataset.keywords)
+        assert "hydro" in set(dataset.themes)
 
     def test_dataset_geoserver_relationship(
         self, db_session: Session, sample_dataset: Dataset
     ):
         """Test relationship between dataset and geoserver."""
-        db_session.refresh(sample_dataset)
         assert sample_dataset.geoserver is not None
         assert sample_dataset.geoserver.name == "Test ArcGIS Server"
 
@@ -138,12 +224,10 @@ class TestDatasetModel:
             access_url="https://test.com",
         )
         db_session.add(dataset)
-        db_session.commit()
-        db_session.refresh(dataset)
+        db_session.flush()
 
         assert len(dataset.keywords) == 3
-        assert "water" in dataset.keywords
-        assert "hydrology" in dataset.keywords
+        assert {"water", "hydrology"} <= set(dataset.keywords)
 
     def test_dataset_flags(self, db_session: Session, sample_geoserver: Geoserver):
         """Test dataset boolean flags."""
@@ -158,8 +242,7 @@ class TestDatasetModel:
             is_active=True,
         )
         db_session.add(dataset)
-        db_session.commit()
-        db_session.refresh(dataset)
+        db_session.flush()
 
         assert dataset.is_cached is True
         assert dataset.change_detected is True
@@ -180,30 +263,24 @@ class TestThemeModel:
             aliases=["water", "stream", "river"],
         )
         db_session.add(theme)
-        db_session.commit()
+        db_session.flush()
 
-        assert theme.id is not None
+        # code is the primary key
+        assert db_session.get(Theme, "hydro") is theme
         assert theme.code == "hydro"
         assert theme.name == "Hydrology"
-        assert "water" in theme.aliases
+        assert "water" in set(theme.aliases)
 
     def test_theme_hierarchy(self, db_session: Session):
         """Test hierarchical theme relationships."""
         parent = Theme(code="transport", name="Transportation")
+        parent.children.append(Theme(code="roads", name="Roads"))
+        # Both rows go out in one flush, parent first
         db_session.add(parent)
-        db_session.commit()
-
-        child = Theme(
-            code="roads",
-            name="Roads",
-            parent_id=parent.id,
-        )
-        db_session.add(child)
-        db_session.commit()
-        db_session.refresh(parent)
-        db_session.refresh(child)
+        db_session.flush()
 
-        assert child.parent_id == parent.id
+        child = parent.children[0]
+        assert child.parent_code == parent.code
         assert child.parent.code == "transport"
         assert len(parent.children) == 1
         assert parent.children[0].code == "roads"
@@ -213,55 +290,40 @@ class TestThemeModel:
 class TestDownloadJobModel:
     """Tests for DownloadJob model."""
 
-    def test_create_download_job(self, db_session: Session, sample_dataset: Dataset):
-        """Test creating a download job."""
-        job = DownloadJob(
-            dataset_id=sample_dataset.id,
-            status=JobStatus.PENDING,
-            format="geojson",
-            total_chunks=1,
-            completed_chunks=0,
-        )
-        db_session.add(job)
-        db_session.commit()
-
-        assert job.id is not None
-        assert job.dataset_id == sample_dataset.id
-        assert job.status == JobStatus.PENDING
-        assert job.format == "geojson"
-
-    def test_download_job_progress(self, db_session: Session, sample_dataset: Dataset):
-        """Test job progress tracking."""
+    def test_create_download_job(self, sample_jobs: list[DownloadJob], job_dataset: Dataset):
+        """Test creating download jobs."""
+        assert [job.total_chunks for job in sample_jobs] == [1, 10, 5]
+        for job in sample_jobs:
+            assert job.id is not None
+            assert job.dataset_id == job_dataset.id
+            assert job.status == JobStatus.PENDING
+            assert job.output_format == "geojson"
+            assert job.chunks_completed == 0
+
+    def test_download_job_progress(self):
+        """Test job progress tracking as chunks complete (no database)."""
         job = DownloadJob(
-            dataset_id=sample_dataset.id,
-            status=JobStatus.IN_PROGRESS,
-            format="geojson",
+            dataset_id=uuid4(),
+            status=JobStatus.RUNNING,
+            output_format="geojson",
             total_chunks=10,
-            completed_chunks=3,
+            chunks_completed=0,
         )
-        db_session.add(job)
-        db_session.commit()
-        db_session.refresh(job)
 
-        # Progress is 30%
-        assert job.total_chunks == 10
-        assert job.completed_chunks == 3
+        for _ in range(3):
+            job.chunks_completed += 1
+
+        assert job.chunks_completed / job.total_chunks == pytest.approx(0.3)
+        assert "progress=3/10" in repr(job)
 
     def test_download_job_dataset_relationship(
-        self, db_session: Session, sample_dataset: Dataset
+        self, db_session: Session, sample_jobs: list[DownloadJob], job_dataset: Dataset
     ):
         """Test relationship between job and dataset."""
-        job = DownloadJob(
-            dataset_id=sample_dataset.id,
-            status=JobStatus.PENDING,
-            format="geojson",
-        )
-        db_session.add(job)
-        db_session.commit()
-        db_session.refresh(job)
+        job = db_session.merge(sample_jobs[0], load=False)
 
         assert job.dataset is not None
-        assert job.dataset.name == sample_dataset.name
+        assert job.dataset.name == job_dataset.name
 
 
 @pytest.mark.unit
@@ -279,7 +341,7 @@ class TestChangeCheckModel:
             current_etag="abc123",
         )
         db_session.add(check)
-        db_session.commit()
+        db_session.flush()
 
         assert check.id is not None
         assert check.dataset_id == sample_dataset.id
@@ -287,25 +349,40 @@ class TestChangeCheckModel:
         assert check.changed is False
         assert check.conclusive is True
 
-    def test_change_check_methods(self, db_session: Session, sample_dataset: Dataset):
-        """Test different change check methods."""
-        methods = [
-            ChangeCheckMethod.ETAG,
-            ChangeCheckMethod.LAST_MODIFIED,
-            ChangeCheckMethod.PROVIDER_METADATA,
-        ]
-
-        for method in methods:
-            check = ChangeCheck(
+    @pytest.mark.parametrize("method", _METHODS)
+    def test_change_check_method(
+        self, db_session: Session, sample_dataset: Dataset, method: ChangeCheckMethod
+    ):
+        """Test storing a change check for each method."""
+        db_session.add(
+            ChangeCheck(
                 dataset_id=sample_dataset.id,
                 method=method,
                 changed=False,
                 conclusive=True,
             )
-            db_session.add(check)
+        )
+        db_session.flush()
 
-        db_session.commit()
+        checks = db_session.scalars(_CHECKS_BY_DATASET, {"dataset_id": sample_dataset.id}).all()
+        assert [c.method for c in checks] == [method]
+
+    def test_change_check_methods(self, db_session: Session, sample_dataset: Dataset):
+        """Test storing one change check per method for the same dataset."""
+        db_session.bulk_insert_mappings(
+            ChangeCheck,
+            [
+                {
+                    "dataset_id": sample_dataset.id,
+                    "method": method,
+                    "changed": False,
+                    "conclusive": True,
+                }
+                for method in _METHODS
+            ],
+        )
+        db_session.flush()
 
-        checks = db_session.query(ChangeCheck).filter_by(dataset_id=sample_dataset.id).all()
+        checks = db_session.scalars(_CHECKS_BY_DATASET, {"dataset_id": sample_dataset.id}).all()
         assert len(checks) == 3
-        assert all(c.method in methods for c in checks)
+        assert all(c.method in _METHODS for c in checks)